@@ -0,0 +1,162 @@
+import os
+import json
+import threading
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from instrumentation import enable, prometheus_text
+from realistic_strategy_analyzer import RealisticStrategyAnalyzer, run_analysis
+
+HOST = os.environ.get('ANALYSIS_WORKER_HOST', '127.0.0.1')
+PORT = int(os.environ.get('ANALYSIS_WORKER_PORT', 8765))
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class AnalysisWorker:
+    """Long-lived analysis service keeping the analyzer, bar cache and RNG warm
+
+    Jobs run one at a time on a single executor thread (the analyzer is not
+    thread-safe). Requests with identical parameters that arrive while a job
+    is running share its Future instead of queueing a duplicate run.
+    """
+
+    def __init__(self, analyzer: RealisticStrategyAnalyzer = None):
+        self.analyzer = analyzer or RealisticStrategyAnalyzer()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._in_flight = {}  # parameter key -> Future
+        self.jobs_run = 0
+        self.requests_coalesced = 0
+
+    def submit(self, params: Dict) -> Future:
+        """Schedule an analysis, or join the identical one already in flight"""
+        key, kwargs = self._normalize(params)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.requests_coalesced += 1
+                return future
+            future = self._executor.submit(self._run, kwargs)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._finish(key))
+        return future
+
+    def stats(self) -> Dict:
+        with self._lock:
+            in_flight = len(self._in_flight)
+        return {'jobs_run': self.jobs_run, 'requests_coalesced': self.requests_coalesced,
+                'in_flight': in_flight, 'bar_cache': self.analyzer.bar_store.cache_stats()}
+
+    def _run(self, kwargs: Dict) -> Dict:
+        self.jobs_run += 1
+        return run_analysis(self.analyzer, **kwargs)
+
+    def _finish(self, key: Tuple):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _normalize(params: Dict) -> Tuple[Tuple, Dict]:
+        if not isinstance(params, dict):
+            raise ValueError("request body must be a JSON object")
+        tickers = params.get('tickers')
+        if tickers is not None and not isinstance(tickers, list):
+            raise ValueError("tickers must be a list")
+        volatility = params.get('volatility')
+        kwargs = {
+            'tickers': [str(t).upper() for t in tickers] if tickers else None,
+            'volatility': float(volatility) if volatility is not None else None,
+            'days': int(params.get('days', 30)),
+            'num_simulations': int(params.get('simulations', 10000))
+        }
+        if kwargs['days'] <= 0 or kwargs['num_simulations'] <= 0:
+            raise ValueError("days and simulations must be positive")
+        key = (tuple(kwargs['tickers'] or ()), kwargs['volatility'], kwargs['days'],
+               kwargs['num_simulations'])
+        return key, kwargs
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """POST /analysis with {tickers, volatility, days, simulations}; GET /health and /metrics"""
+
+    worker: AnalysisWorker = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', **self.worker.stats()})
+        elif self.path == '/metrics':
+            self._send_text(200, prometheus_text())
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/analysis':
+            self._send(404, {'error': 'Not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            params = json.loads(self.rfile.read(length) or b'{}')
+            future = self.worker.submit(params)
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': f"Invalid request: {e}"})
+            return
+
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error running analysis: {e}")
+            self._send(500, {'error': 'Analysis failed'})
+            return
+        if results:
+            self._send(200, results)
+        else:
+            self._send(404, {'error': 'No stock data available for analysis'})
+
+    def log_message(self, format, *args):
+        pass  # keep the worker's stdout for errors
+
+    def _send(self, status: int, body: Dict):
+        payload = json.dumps(body, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_text(self, status: int, body: str):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def serve(host: str = HOST, port: int = PORT, worker: AnalysisWorker = None) -> ThreadingHTTPServer:
+    """Create the HTTP server; call serve_forever() on the result"""
+    handler = type('Handler', (AnalysisRequestHandler,), {'worker': worker or AnalysisWorker()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    enable()  # a long-lived service always records stage timings for /metrics
+    server = serve()
+    print(f"Analysis worker listening on http://{HOST}:{PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from bar_store import BarStore, get_default_store
+from indicators import momentum_score, rolling_mean, rsi
+from instrumentation import traced
+from market_data import PERIOD_OFFSETS, align_frames
+from realistic_strategy_analyzer import MODERATE_RISK_TICKERS, probability_10pct
+
+# Walk-forward backtest of the two ranking signals. Both are computed for
+# every ticker at every month-end rebalance as (rebalances, tickers) arrays;
+# the top `top_k` names are held equally weighted until the next rebalance
+# and each holding counts as a hit if it gained the 10% target by then.
+#
+#   python backtester.py --period 10y --top-k 5 [TICKER ...]
+
+SIGNALS = ['momentum_score', 'probability_10pct']
+TARGET_RETURN = 0.10
+
+
+def _window_starts(dates: pd.DatetimeIndex, rows: np.ndarray, period: str) -> np.ndarray:
+    """Row of the first bar in the `period` window ending at each of `rows`
+
+    Matches period_start(): the window opens at the normalized anchor date
+    minus the period, as when the analyzers fetch `period` of bars.
+    """
+    starts = (dates[rows] - PERIOD_OFFSETS[period]).normalize()
+    return np.searchsorted(dates, starts)
+
+
+class Backtester:
+    """Month-end rebalancing backtest over a date-aligned close/volume panel"""
+
+    def __init__(self, close: np.ndarray, volume: np.ndarray, dates: pd.DatetimeIndex,
+                 tickers: List[str]):
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.dates = dates
+        self.tickers = list(tickers)
+
+    @classmethod
+    def from_store(cls, tickers: List[str], period: str = '10y',
+                   store: Optional[BarStore] = None) -> 'Backtester':
+        """Load cached (or fetched) daily bars for the universe"""
+        store = store or get_default_store()
+        panel = align_frames(store.get_many(tickers, period))
+        if panel.empty:
+            return cls(np.empty((0, 0)), np.empty((0, 0)), pd.DatetimeIndex([]), [])
+        close = panel['Close']
+        volume = panel['Volume'].reindex(columns=close.columns)
+        return cls(close.to_numpy(dtype=np.float64), volume.to_numpy(dtype=np.float64),
+                   close.index, list(close.columns))
+
+    def rebalance_rows(self) -> np.ndarray:
+        """Last bar of every month, excluding the final bar (it has no forward return)"""
+        if len(self.dates) < 2:
+            return np.array([], dtype=int)
+        months = self.dates.year * 12 + self.dates.month
+        return np.flatnonzero(np.diff(months) != 0)
+
+    def signals(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Both ranking signals and their inputs at each of `rows`, shape (rows, tickers)
+
+        momentum_score uses the 1mo window analyze_multiple_stocks fetches;
+        probability_10pct the 3mo window of analyze_moderate_risk_stocks.
+        """
+        close, volume = self.close, self.volume
+        cols = np.arange(close.shape[1])
+        current = close[rows]
+        month_start = _window_starts(self.dates, rows, '1mo')
+        quarter_start = _window_starts(self.dates, rows, '3mo')
+
+        # Daily returns summed over each 3mo window through prefix sums, so
+        # the volatility of every (rebalance, ticker) pair costs O(1)
+        returns = np.full(close.shape, np.nan)
+        returns[1:] = close[1:] / close[:-1] - 1
+        valid = ~np.isnan(returns)
+        prefix = np.zeros((len(close) + 1, close.shape[1]))
+        prefix_sq = np.zeros_like(prefix)
+        prefix_n = np.zeros_like(prefix)
+        np.cumsum(np.where(valid, returns, 0.0), axis=0, out=prefix[1:])
+        np.cumsum(np.where(valid, returns ** 2, 0.0), axis=0, out=prefix_sq[1:])
+        np.cumsum(valid, axis=0, out=prefix_n[1:])
+        # The window's first return would reach back before the window start
+        first = quarter_start + 1
+        n = prefix_n[rows + 1] - prefix_n[first]
+        total = prefix[rows + 1] - prefix[first]
+        total_sq = prefix_sq[rows + 1] - prefix_sq[first]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.maximum(total_sq - total ** 2 / n, 0) / (n - 1)
+            volatility = np.sqrt(variance) * np.sqrt(252) * 100  # Annualized volatility
+            weekly_return = (current / close[rows - 4] - 1) * 100
+            month_first = close[month_start[:, None], cols]
+            momentum_monthly = (current / month_first - 1) * 100
+            monthly_return = (current / close[rows - 20] - 1) * 100
+            volume_spike = volume[rows] / rolling_mean(volume, 20)[rows]
+            above_sma5 = current > rolling_mean(close, 5)[rows]
+            above_sma20 = current > rolling_mean(close, 20)[rows]
+
+        # Like the live screens, a ticker needs 5 (momentum) or 21 (10% screen)
+        # bars to be scored; momentum_score is already NaN through weekly_return
+        probability = probability_10pct(volatility, monthly_return).astype(np.float64)
+        probability[np.isnan(monthly_return)] = np.nan
+        return {
+            'momentum_score': momentum_score(weekly_return, momentum_monthly, volume_spike,
+                                             above_sma5, above_sma20),
+            'probability_10pct': probability,
+            'volatility': volatility,
+            'monthly_return': monthly_return,
+            'rsi': rsi(close)[rows]
+        }
+
+    def forward_returns(self, rows: np.ndarray) -> np.ndarray:
+        """Return from each rebalance to the next (or the last bar), shape (rows, tickers)
+
+        Exit prices are forward-filled, so a ticker that stops trading is
+        held at its last close.
+        """
+        exits = np.append(rows[1:], len(self.close) - 1)
+        observed = np.where(np.isnan(self.close), 0, np.arange(len(self.close))[:, None])
+        last_row = np.maximum.accumulate(observed, axis=0)
+        exit_prices = self.close[last_row[exits], np.arange(self.close.shape[1])]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return exit_prices / self.close[rows] - 1
+
+    @traced()
+    def run(self, signal: str = 'momentum_score', top_k: int = 5,
+            target_return: float = TARGET_RETURN) -> Dict:
+        """Hold the `top_k` highest-`signal` tickers each month and score the picks
+
+        Ties keep universe order. Rates and returns are in percent.
+        """
+        if signal not in SIGNALS:
+            raise ValueError(f"Unknown signal {signal!r}; expected one of {SIGNALS}")
+        rows = self.rebalance_rows()
+        rows = rows[rows >= 20]  # every signal needs a month of bars
+        if len(rows) == 0 or not self.tickers:
+            return {}
+
+        signals = self.signals(rows)
+        scores = signals[signal]
+        forward = self.forward_returns(rows)
+        eligible = ~np.isnan(scores) & ~np.isnan(forward)
+        hits = forward >= target_return
+
+        ranked = np.where(eligible, scores, -np.inf)
+        top_k = min(top_k, len(self.tickers))
+        picks = np.argsort(-ranked, axis=1, kind='stable')[:, :top_k]
+        held = np.take_along_axis(eligible, picks, axis=1)
+        held_returns = np.where(held, np.take_along_axis(forward, picks, axis=1), np.nan)
+        held_hits = np.take_along_axis(hits, picks, axis=1) & held
+
+        # Equal weight across the names held; a month with no picks stays in cash
+        period_returns = np.nansum(held_returns, axis=1) / np.maximum(held.sum(axis=1), 1)
+        positions = held.sum()
+        return {
+            'signal': signal,
+            'top_k': top_k,
+            'target_return': target_return * 100,
+            'start': self.dates[rows[0]].date().isoformat(),
+            'end': self.dates[-1].date().isoformat(),
+            'rebalances': len(rows),
+            'tickers': len(self.tickers),
+            'positions': int(positions),
+            'hit_rate': round(float(held_hits.sum() / positions) * 100, 2) if positions else 0.0,
+            'universe_hit_rate': round(float((hits & eligible).sum() / eligible.sum()) * 100, 2)
+                                 if eligible.any() else 0.0,
+            'mean_period_return': round(float(period_returns.mean()) * 100, 2),
+            'cumulative_return': round(float(np.prod(1 + period_returns) - 1) * 100, 2),
+            'periods_at_target': round(float((period_returns >= target_return).mean()) * 100, 2),
+            'calibration': self.calibration(signals['probability_10pct'], hits, eligible)
+        }
+
+    @staticmethod
+    def calibration(predicted: np.ndarray, hits: np.ndarray, eligible: np.ndarray) -> List[Dict]:
+        """Realized 10% hit rate for each value estimate_probability_10pct can return"""
+        mask = eligible & ~np.isnan(predicted)
+        levels, inverse = np.unique(predicted[mask], return_inverse=True)
+        observations = np.bincount(inverse, minlength=len(levels))
+        realized = np.bincount(inverse, weights=hits[mask], minlength=len(levels))
+        return [{'predicted': float(level), 'observations': int(n),
+                 'realized': round(float(h / n) * 100, 2)}
+                for level, n, h in zip(levels, observations, realized)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the ranking signals")
+    parser.add_argument('tickers', nargs='*', default=MODERATE_RISK_TICKERS)
+    parser.add_argument('--period', default='10y', choices=sorted(PERIOD_OFFSETS))
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+
+    backtester = Backtester.from_store([t.upper() for t in args.tickers], args.period)
+    for signal in SIGNALS:
+        result = backtester.run(signal, args.top_k)
+        if not result:
+            print("Not enough price history to backtest")
+            sys.exit(1)
+        print(f"\n{signal}: top {result['top_k']} of {result['tickers']} tickers, "
+              f"{result['rebalances']} monthly rebalances ({result['start']} to {result['end']})")
+        print(f"  Hit rate (>= {result['target_return']:.0f}%): {result['hit_rate']}% "
+              f"vs {result['universe_hit_rate']}% for the whole universe")
+        print(f"  Mean monthly return: {result['mean_period_return']}%, "
+              f"cumulative: {result['cumulative_return']}%")
+        print(f"  Months the portfolio reached the target: {result['periods_at_target']}%")
+
+    print("\nprobability_10pct calibration (predicted vs realized):")
+    for level in result['calibration']:
+        print(f"  {level['predicted']:4.0f}%: {level['realized']:6.2f}% over {level['observations']} ticker-months")
+
+
+if __name__ == "__main__":
+    main()
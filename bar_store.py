@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from instrumentation import count, traced
+from market_data import (BAR_COLUMNS, MarketDataProvider, align_frames,
+                         default_provider, period_start)
+
+CACHE_DIR = os.environ.get('MARKET_DATA_CACHE', 'market_data_cache')
+
+
+class BarStore:
+    """On-disk columnar cache of daily OHLCV bars, one directory per ticker
+
+    Each ticker is stored as one .npy file per column plus an int64 UTC
+    nanosecond index, so reads are memory-mapped and only the requested
+    slice is copied into a DataFrame. The store keeps the longest period ever
+    requested and tops it up with the bars missing since the last stored
+    timestamp; shorter periods are served by slicing that superset.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, refresh_after: float = 900,
+                 provider: MarketDataProvider = None):
+        self.cache_dir = cache_dir
+        self.refresh_after = refresh_after  # seconds before cached bars are topped up
+        self.provider = provider or default_provider()
+        self.hits = 0
+        self.misses = 0
+        self.bars_fetched = 0
+
+    def get_bars(self, ticker: str, period: str = "1mo") -> pd.DataFrame:
+        """Return bars for `period`, fetching only what the cache is missing"""
+        return self.get_many([ticker], period).get(ticker, pd.DataFrame())
+
+    @traced('BarStore.get_many')
+    def get_many(self, tickers: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
+        """Return {ticker: bars}, batching every cache miss into bulk provider calls"""
+        now = time.time()
+        downloads = []
+        top_ups = {}
+
+        for ticker in tickers:
+            meta = self._read_meta(ticker)
+            if meta is None or not self._covers(ticker, meta, period):
+                # Nothing usable on disk - download the whole requested period
+                downloads.append(ticker)
+            elif now - meta['fetched_at'] > self.refresh_after:
+                # Top up from the last stored bar; it is re-fetched because the
+                # last bar of a trading day may have been stored mid-session
+                last = self._last_timestamp(ticker, meta).normalize()
+                top_ups.setdefault(last, []).append(ticker)
+            else:
+                self.hits += 1
+
+        count('cache_hits', len(tickers) - len(downloads) - sum(map(len, top_ups.values())))
+        count('cache_misses', len(downloads) + sum(map(len, top_ups.values())))
+
+        if downloads:
+            self.misses += len(downloads)
+            for ticker, data in self._download(downloads, period=period).items():
+                self._write(ticker, data, period)
+
+        for start, group in top_ups.items():
+            self.misses += len(group)
+            new_bars = self._download(group, start=start)
+            for ticker in group:
+                self._top_up(ticker, new_bars.get(ticker))
+
+        results = {}
+        for ticker in tickers:
+            if self._read_meta(ticker) is not None:
+                results[ticker] = self._read(ticker, period)
+        return results
+
+    def tickers(self) -> List[str]:
+        """Every ticker with bars in the cache, sorted"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return sorted(name for name in os.listdir(self.cache_dir)
+                      if os.path.exists(os.path.join(self.cache_dir, name, 'meta.json')))
+
+    def get_panel(self, tickers: List[str], period: str = "1mo") -> pd.DataFrame:
+        """Return one date-aligned frame with (field, ticker) columns"""
+        return align_frames(self.get_many(tickers, period))
+
+    def cache_stats(self) -> Dict:
+        """Return hit/miss counters for this store"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0,
+            'bars_fetched': self.bars_fetched
+        }
+
+    def _download(self, tickers: List[str], period: Optional[str] = None,
+                  start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        frames = self.provider.fetch_history(tickers, period=period, start=start)
+        self.bars_fetched += sum(len(data) for data in frames.values())
+        count('tickers_fetched', len(tickers))
+        count('bars_fetched', sum(len(data) for data in frames.values()))
+        return frames
+
+    def _top_up(self, ticker: str, new_data: Optional[pd.DataFrame]):
+        meta = self._read_meta(ticker)
+        stored = self._read(ticker, 'max')
+        if new_data is not None and not new_data.empty:
+            if new_data.index.tz is not None:
+                new_data = new_data.tz_convert(meta['tz'])
+            stored = stored[stored.index < new_data.index[0]]
+            stored = pd.concat([stored, new_data[stored.columns.intersection(new_data.columns)]])
+        self._write(ticker, stored, meta['period'], start=meta['start'])
+
+    def _covers(self, ticker: str, meta: Dict, period: str) -> bool:
+        if meta['period'] == 'max':
+            return True
+        if period == 'max':
+            return False
+        start = period_start(period, self._last_timestamp(ticker, meta))
+        return start >= pd.Timestamp(meta['start'], tz='UTC')
+
+    def _last_timestamp(self, ticker: str, meta: Dict) -> pd.Timestamp:
+        index = np.load(self._path(ticker, 'index'), mmap_mode='r')
+        return pd.Timestamp(int(index[-1]), tz='UTC').tz_convert(meta['tz'])
+
+    def _write(self, ticker: str, data: pd.DataFrame, period: str, start: Optional[int] = None):
+        directory = os.path.join(self.cache_dir, ticker)
+        os.makedirs(directory, exist_ok=True)
+
+        index = data.index
+        tz = str(index.tz) if index.tz is not None else 'UTC'
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        self._save(ticker, 'index', index.tz_convert('UTC').as_unit('ns').asi8)
+        for column in BAR_COLUMNS:
+            if column in data.columns:
+                self._save(ticker, column, data[column].to_numpy(dtype=np.float64))
+
+        if start is None and period != 'max':
+            # Coverage is measured back from the newest bar, matching _read
+            start = period_start(period, index[-1].tz_convert(tz)).tz_convert('UTC').value
+        meta = {'period': period, 'start': start, 'tz': tz, 'fetched_at': time.time()}
+        tmp = os.path.join(directory, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, 'meta.json'))
+
+    def _save(self, ticker: str, column: str, values: np.ndarray):
+        # Write-then-rename so readers never see a half-written column
+        path = self._path(ticker, column)
+        tmp = path + '.tmp.npy'
+        np.save(tmp, values)
+        os.replace(tmp, path)
+
+    def _read(self, ticker: str, period: str) -> pd.DataFrame:
+        meta = self._read_meta(ticker)
+        index = np.load(self._path(ticker, 'index'), mmap_mode='r')
+
+        first = 0
+        if period != 'max' and len(index):
+            start = period_start(period, self._last_timestamp(ticker, meta))
+            first = int(np.searchsorted(index, start.tz_convert('UTC').value, side='left'))
+
+        columns = {}
+        for column in BAR_COLUMNS:
+            path = self._path(ticker, column)
+            if os.path.exists(path):
+                columns[column] = np.array(np.load(path, mmap_mode='r')[first:])
+
+        dates = pd.to_datetime(np.array(index[first:]), utc=True).tz_convert(meta['tz'])
+        return pd.DataFrame(columns, index=dates.rename('Date'))
+
+    def _read_meta(self, ticker: str) -> Optional[Dict]:
+        path = os.path.join(self.cache_dir, ticker, 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _path(self, ticker: str, column: str) -> str:
+        return os.path.join(self.cache_dir, ticker, f'{column}.npy')
+
+
+_default_store = None
+
+
+def get_default_store() -> BarStore:
+    """Return the process-wide store shared by the analyzers"""
+    global _default_store
+    if _default_store is None:
+        _default_store = BarStore()
+    return _default_store
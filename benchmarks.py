@@ -0,0 +1,260 @@
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+import platform
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from backtester import Backtester
+from bar_store import BarStore
+from earnings_calendar import EarningsCalendar
+from investment_analyzer import MonteCarloSimulator, OptionsCalculator, StockAnalyzer
+from market_data import MarketDataProvider, period_start
+from realistic_strategy_analyzer import RealisticStrategyAnalyzer, score_risk
+
+# Benchmarks for the simulation, indicator and options paths on synthetic,
+# seeded data (no network). `run` writes timings to JSON; `compare` diffs two
+# result files and exits non-zero when a case got slower than the threshold.
+#
+#   python benchmarks.py run --output bench-HEAD.json [--quick] [--only rsi]
+#   python benchmarks.py compare bench-base.json bench-HEAD.json
+
+PATH_SIZES = [1000, 10000, 100000, 1000000, 10000000]
+TICKER_SIZES = [10, 100, 1000, 5000]
+BAR_SIZES = [1000, 10000, 100000, 1000000]
+GRID_SIZES = [1000, 10000, 100000, 1000000]
+QUICK_LIMITS = {'paths': 100000, 'tickers': 100, 'bars': 100000, 'grid': 100000}
+SYNTHETIC_END = pd.Timestamp('2024-12-31', tz='America/New_York')
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Deterministic GBM bars for any ticker, seeded from the ticker name"""
+
+    def __init__(self, bars: int = 300):
+        self.bars = bars
+
+    def fetch_history(self, tickers: List[str], period: Optional[str] = None,
+                      start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        index = pd.bdate_range(end=SYNTHETIC_END, periods=self.bars, name='Date')
+        first = start if start is not None else period_start(period or 'max', index[-1])
+        results = {}
+        for ticker in tickers:
+            rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+            close = rng.uniform(20, 500) * np.exp(np.cumsum(rng.normal(0.0005, 0.02, self.bars)))
+            data = pd.DataFrame({
+                'Open': close * (1 + rng.normal(0, 0.002, self.bars)),
+                'High': close * 1.01,
+                'Low': close * 0.99,
+                'Close': close,
+                'Volume': rng.uniform(1e6, 5e7, self.bars).round()
+            }, index=index)
+            results[ticker] = data[data.index >= first] if first is not None else data
+        return results
+
+
+def synthetic_tickers(count: int) -> List[str]:
+    return [f"SYN{i:05d}" for i in range(count)]
+
+
+def time_call(func: Callable, min_time: float = 1.0, max_repeats: int = 5) -> Dict:
+    """Best-of-N wall time, repeating cheap calls until `min_time` has elapsed"""
+    times = []
+    while len(times) < max_repeats and (not times or sum(times) < min_time):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'seconds': min(times), 'mean': sum(times) / len(times), 'repeats': len(times)}
+
+
+def _sizes(sizes: List[int], kind: str, quick: bool) -> List[int]:
+    return [s for s in sizes if not quick or s <= QUICK_LIMITS[kind]]
+
+
+def benchmark_cases(workdir: str, quick: bool = False, only: Optional[str] = None) -> Dict[str, Callable]:
+    """Map 'name[size]' to a zero-argument callable for every benchmark case
+
+    With `only`, cases whose name does not contain it are skipped before
+    their setup (data generation, cache population) runs.
+    """
+    cases = {}
+
+    def wanted(name: str) -> bool:
+        return not only or only in name
+
+    # simulate_stock_paths materializes every path (days + 1 floats each), so
+    # it stops at 10^6; the streamed simulations go up to 10^7
+    for n in _sizes(PATH_SIZES[:-1], 'paths', quick):
+        name = f'simulate_stock_paths[{n}]'
+        if wanted(name):
+            simulator = MonteCarloSimulator(num_simulations=n, seed=0)
+            cases[name] = lambda s=simulator: s.simulate_stock_paths(100, 0.3, 30)
+
+    for n in _sizes(PATH_SIZES, 'paths', quick):
+        name = f'calculate_probability_of_target[{n}]'
+        if wanted(name):
+            simulator = MonteCarloSimulator(num_simulations=n, seed=0)
+            cases[name] = lambda s=simulator: s.calculate_probability_of_target(100, 110, 0.3, 30)
+    name = 'calculate_probability_of_target[analytic]'
+    if wanted(name):
+        analytic = MonteCarloSimulator(mode='analytic')
+        cases[name] = lambda: analytic.calculate_probability_of_target(100, 110, 0.3, 30)
+
+    positions = [{'weight': 0.2, 'expected_return': 0.10 + 0.02 * i, 'volatility': 0.25 + 0.05 * i}
+                 for i in range(5)]
+    for n in _sizes(PATH_SIZES, 'paths', quick):
+        name = f'portfolio_simulation[{n}]'
+        if wanted(name):
+            simulator = MonteCarloSimulator(num_simulations=n, seed=0)
+            cases[name] = lambda s=simulator: s.portfolio_simulation(positions)
+
+    top_stocks = pd.DataFrame({'ticker': synthetic_tickers(5), 'volatility': [20.0, 25.0, 30.0, 35.0, 40.0]})
+    realistic = RealisticStrategyAnalyzer(seed=0)
+    for n in _sizes(PATH_SIZES, 'paths', quick):
+        name = f'diversified_portfolio_simulation[{n}]'
+        if wanted(name):
+            cases[name] = lambda n=n: realistic.diversified_portfolio_simulation(top_stocks, num_simulations=n)
+
+    for n in _sizes(BAR_SIZES, 'bars', quick):
+        name = f'score_risk[{n}]'
+        if wanted(name):
+            rng = np.random.default_rng(n)
+            columns = rng.uniform(5, 80, n), rng.uniform(-20, 20, n), rng.uniform(0, 100, n)
+            cases[name] = lambda c=columns: score_risk(*c)
+
+    store = BarStore(os.path.join(workdir, 'bars'), refresh_after=float('inf'),
+                     provider=SyntheticProvider())
+    analyzer = StockAnalyzer(store, EarningsCalendar(os.path.join(workdir, 'earnings.json')))
+    for n in _sizes(BAR_SIZES, 'bars', quick):
+        name = f'calculate_rsi[{n}]'
+        if wanted(name):
+            prices = pd.Series(100 * np.exp(np.cumsum(np.random.default_rng(n).normal(0, 0.02, n))))
+            cases[name] = lambda p=prices: analyzer.calculate_rsi(p)
+
+    for n in _sizes(TICKER_SIZES, 'tickers', quick):
+        name = f'analyze_multiple_stocks[{n}]'
+        if wanted(name):
+            tickers = synthetic_tickers(n)
+            store.get_many(tickers)  # populate the cache so the case measures warm refreshes
+            cases[name] = lambda t=tickers: analyzer.analyze_multiple_stocks(t)
+
+    options = OptionsCalculator()
+    name = 'find_optimal_strikes'
+    if wanted(name):
+        cases[name] = lambda: options.find_optimal_strikes(250.0)
+    for n in _sizes(GRID_SIZES, 'grid', quick):
+        side = int(round(n ** 0.25))
+        name = f'search_call_grid[{side ** 4}]'
+        if wanted(name):
+            grid = (np.linspace(0.05, 0.5, side), np.linspace(-0.1, 0.2, side),
+                    np.linspace(7, 180, side), np.linspace(1e5, 1e6, side))
+            cases[name] = lambda g=grid: options.search_call_grid(250.0, *g)
+
+    # Ten years of daily bars, monthly rebalances
+    universe = 100 if quick else 500
+    name = f'backtest[{universe}x10y]'
+    if wanted(name):
+        history = BarStore(os.path.join(workdir, 'history'), refresh_after=float('inf'),
+                           provider=SyntheticProvider(bars=2520))
+        backtester = Backtester.from_store(synthetic_tickers(universe), '10y', history)
+        cases[name] = lambda: backtester.run('probability_10pct')
+
+    return cases
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(output: str, quick: bool = False, only: Optional[str] = None) -> Dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        print("Preparing synthetic data...")
+        cases = benchmark_cases(workdir, quick, only)
+        results = {}
+        for name, func in cases.items():
+            func()  # warm-up: imports, caches, allocator
+            results[name] = time_call(func)
+            print(f"{name:50s} {results[name]['seconds'] * 1000:12.2f} ms")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'quick': quick
+        },
+        'results': results
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+    return report
+
+
+def compare(base_path: str, head_path: str, threshold: float = 0.15) -> List[Dict]:
+    """Per-case timing ratios; a ratio above 1 + threshold is a regression"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    rows = []
+    for name in head['results']:
+        if name not in base['results']:
+            continue
+        before = base['results'][name]['seconds']
+        after = head['results'][name]['seconds']
+        ratio = after / before if before else float('inf')
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        else:
+            status = ''
+        rows.append({'case': name, 'base': before, 'head': after, 'ratio': ratio, 'status': status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance benchmarks on synthetic data")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmarks and save timings")
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--quick', action='store_true', help="skip the largest sizes")
+    run_parser.add_argument('--only', help="run only cases whose name contains this text")
+
+    compare_parser = commands.add_parser('compare', help="flag regressions between two runs")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=0.15,
+                                help="relative slowdown reported as a regression (default 0.15)")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args.output, args.quick, args.only)
+        return
+
+    rows = compare(args.base, args.head, args.threshold)
+    for row in rows:
+        print(f"{row['case']:50s} {row['base'] * 1000:10.2f} -> {row['head'] * 1000:10.2f} ms "
+              f"x{row['ratio']:.2f} {row['status']}")
+    regressions = [row for row in rows if row['status'] == 'REGRESSION']
+    print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from bar_store import BarStore, get_default_store
+
+
+def factor_matrix(matrix: np.ndarray) -> np.ndarray:
+    """Return F with F @ F.T == matrix, falling back to eigenvalues if not positive definite"""
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        # Short histories or duplicate assets leave the estimate only
+        # semi-definite; clip the negative noise eigenvalues instead
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+class CovarianceEstimator:
+    """Daily log-return covariance of a basket, estimated from cached bars
+
+    Estimates and their factors are cached per data window (tickers, period,
+    first and last bar), so repeated simulations over the same history pay
+    for the O(n^3) factorization once.
+    """
+
+    def __init__(self, bar_store: BarStore = None, period: str = "1y"):
+        self.bar_store = bar_store or get_default_store()
+        self.period = period
+        self._cache = {}
+
+    def estimate(self, tickers: List[str], period: str = None) -> Dict:
+        """Return mean, covariance, correlation and their factors for `tickers`"""
+        period = period or self.period
+        close = self.bar_store.get_panel(tickers, period)['Close'].reindex(columns=tickers)
+        missing = close.columns[close.isna().all()].tolist()
+        if missing:
+            raise ValueError(f"No price history for {', '.join(missing)}")
+
+        key = (tuple(tickers), period, close.index[0], close.index[-1])
+        if key not in self._cache:
+            self._cache[key] = self._estimate(close)
+        return self._cache[key]
+
+    def correlation_factor(self, tickers: List[str], period: str = None) -> np.ndarray:
+        """Factor of the return correlation matrix, for correlating unit normal draws"""
+        return self.estimate(tickers, period)['correlation_factor']
+
+    def _estimate(self, close: pd.DataFrame) -> Dict:
+        # Only dates where every asset traded, so the matrix stays consistent
+        log_returns = np.log(close).diff().dropna(how='any').to_numpy()
+        if len(log_returns) < 2:
+            raise ValueError("Not enough overlapping price history to estimate covariance")
+
+        covariance = np.atleast_2d(np.cov(log_returns, rowvar=False))
+        std = np.sqrt(np.diag(covariance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = covariance / np.outer(std, std)
+        correlation = np.nan_to_num(correlation)
+        np.fill_diagonal(correlation, 1.0)
+
+        return {
+            'tickers': close.columns.tolist(),
+            'observations': len(log_returns),
+            'mean': log_returns.mean(axis=0),
+            'covariance': covariance,
+            'factor': factor_matrix(covariance),
+            'correlation': correlation,
+            'correlation_factor': factor_matrix(correlation)
+        }
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import threading
+import pandas as pd
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Iterable, List, Optional, Tuple
+
+CALENDAR_PATH = os.environ.get('EARNINGS_CALENDAR', 'earnings_calendar.json')
+_FAILED = object()  # _fetch result for a failed lookup, as opposed to None (no date scheduled)
+
+
+def fetch_yahoo_earnings_date(ticker: str) -> Optional[date]:
+    """Next earnings date from Yahoo Finance, or None if none is scheduled"""
+    import yfinance as yf
+
+    calendar = yf.Ticker(ticker).calendar
+    if calendar is None:
+        return None
+    if isinstance(calendar, dict):
+        # Newer yfinance: {'Earnings Date': [date, ...], ...}
+        dates = calendar.get('Earnings Date') or []
+        value = dates[0] if dates else None
+    elif not calendar.empty:
+        # Older yfinance: a DataFrame with the date in the first cell
+        value = calendar.iloc[0, 0]
+    else:
+        value = None
+    return pd.Timestamp(value).date() if value is not None and not pd.isna(value) else None
+
+
+class EarningsCalendar:
+    """Persistent ticker -> next earnings date index with per-entry TTL
+
+    Entries are kept in a JSON file and mirrored in a sorted (date, ticker)
+    list, so "who reports between D1 and D2" is two bisections. Missing
+    tickers are fetched in bulk on a thread pool; stale ones keep serving
+    their cached date while a background refresh replaces them.
+    """
+
+    def __init__(self, path: str = CALENDAR_PATH, ttl: float = 86400,
+                 fetcher: Callable[[str], Optional[date]] = None, max_workers: int = 4):
+        self.path = path
+        self.ttl = ttl  # seconds before an entry is refreshed
+        self.fetcher = fetcher or fetch_yahoo_earnings_date
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._entries = {}  # ticker -> {'date': 'YYYY-MM-DD' or None, 'fetched_at': float}
+        self._index = []  # sorted (date, ticker) for tickers with a known date
+        self._read()
+
+    def get(self, ticker: str) -> Optional[date]:
+        """Earnings date for one ticker, fetching it if never seen"""
+        self.load([ticker])
+        entry = self._entries.get(ticker)
+        return date.fromisoformat(entry['date']) if entry and entry['date'] else None
+
+    def load(self, tickers: Iterable[str]):
+        """Make sure every ticker has an entry; unknown ones are fetched now, stale ones in the background"""
+        tickers = list(dict.fromkeys(tickers))
+        missing = [t for t in tickers if t not in self._entries]
+        if missing:
+            self._store(zip(missing, self._pool.map(self._fetch, missing)))
+            self.save()
+        self.refresh_stale(tickers)
+
+    def refresh_stale(self, tickers: Optional[Iterable[str]] = None, wait: bool = False):
+        """Re-fetch expired entries on the thread pool without blocking readers"""
+        now = time.time()
+        with self._lock:
+            candidates = self._entries if tickers is None else [t for t in tickers if t in self._entries]
+            stale = [t for t in candidates
+                     if now - self._entries[t]['fetched_at'] > self.ttl and t not in self._refreshing]
+            self._refreshing.update(stale)
+        if not stale:
+            return
+
+        def refresh():
+            try:
+                self._store(zip(stale, map(self._fetch, stale)))
+                self.save()
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(stale)
+
+        future = self._pool.submit(refresh)
+        if wait:
+            future.result()
+
+    def between(self, start, end) -> List[Tuple[date, str]]:
+        """(date, ticker) pairs reporting on or between `start` and `end`, in date order"""
+        start, end = pd.Timestamp(start).date().isoformat(), pd.Timestamp(end).date().isoformat()
+        with self._lock:
+            lo = bisect_left(self._index, (start, ''))
+            hi = bisect_right(self._index, (end, '\uffff'))
+            matches = self._index[lo:hi]
+        return [(date.fromisoformat(d), t) for d, t in matches]
+
+    def load_file(self, path: str):
+        """Bulk-load a CSV with ticker and earnings_date columns (e.g. an exported calendar)"""
+        frame = pd.read_csv(path)
+        dates = pd.to_datetime(frame['earnings_date'], errors='coerce')
+        self._store((t, None if pd.isna(d) else d.date()) for t, d in zip(frame['ticker'], dates))
+        self.save()
+
+    def save(self):
+        with self._lock:
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+
+    def _fetch(self, ticker: str):
+        try:
+            return self.fetcher(ticker)
+        except Exception as e:
+            print(f"Error fetching earnings date for {ticker}: {e}")
+            return _FAILED
+
+    def _store(self, results: Iterable[Tuple[str, Optional[date]]]):
+        results = list(results)  # fetch outside the lock so readers never wait on the network
+        now = time.time()
+        with self._lock:
+            for ticker, value in results:
+                if value is _FAILED:
+                    # Keep the previous entry (or none) so the next request retries
+                    continue
+                old = self._entries.get(ticker)
+                if old and old['date']:
+                    del self._index[bisect_left(self._index, (old['date'], ticker))]
+                new = value.isoformat() if value is not None else None
+                self._entries[ticker] = {'date': new, 'fetched_at': now}
+                if new:
+                    insort(self._index, (new, ticker))
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading earnings calendar {self.path}: {e}")
+            self._entries = {}
+        self._index = sorted((e['date'], t) for t, e in self._entries.items() if e['date'])
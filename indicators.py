@@ -0,0 +1,292 @@
+from __future__ import annotations
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Panels are 2-D float arrays of shape (bars, tickers). Each ticker's history
+# is right-aligned so row -1 is its latest bar and shorter histories are
+# padded with leading NaNs; row -k then means iloc[-k] for every ticker.
+
+MONTH_BARS = 22  # trading days in a typical 1mo window
+
+
+def build_panel(frames: Dict[str, pd.DataFrame], field: str = 'Close') -> Tuple[np.ndarray, List[str]]:
+    """Stack one column of per-ticker bars into a right-aligned panel"""
+    tickers = [t for t, data in frames.items() if not data.empty and field in data.columns]
+    length = max((len(frames[t]) for t in tickers), default=0)
+    panel = np.full((length, len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        values = frames[ticker][field].to_numpy(dtype=np.float64)
+        panel[length - len(values):, j] = values
+    return panel, tickers
+
+
+def history_mask(panel: np.ndarray) -> np.ndarray:
+    """True from each ticker's first observed bar onward"""
+    return np.logical_or.accumulate(~np.isnan(panel), axis=0)
+
+
+def bar_counts(panel: np.ndarray) -> np.ndarray:
+    """Number of bars in each ticker's own history"""
+    return history_mask(panel).sum(axis=0)
+
+
+def rolling_mean(panel: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` bars; NaN wherever the window is incomplete"""
+    panel = np.asarray(panel, dtype=np.float64)
+    result = np.full(panel.shape, np.nan)
+    if panel.shape[0] >= window:
+        result[window - 1:] = sliding_window_view(panel, window, axis=0).mean(axis=-1)
+    return result
+
+
+def pct_change(panel: np.ndarray) -> np.ndarray:
+    """Bar-over-bar fractional change"""
+    panel = np.asarray(panel, dtype=np.float64)
+    result = np.full(panel.shape, np.nan)
+    result[1:] = panel[1:] / panel[:-1] - 1
+    return result
+
+
+def rsi(panel: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple-moving-average RSI, matching the original pandas implementation"""
+    panel = np.asarray(panel, dtype=np.float64)
+    delta = np.full(panel.shape, np.nan)
+    delta[1:] = panel[1:] - panel[:-1]
+
+    # pandas' where() turns the leading NaN delta into a 0 gain/loss, so the
+    # first own bar counts towards the window; the padding before it must not
+    own = history_mask(panel)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[~own] = np.nan
+    loss[~own] = np.nan
+
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def first_value(panel: np.ndarray) -> np.ndarray:
+    """Each ticker's first observed value (iloc[0] on its own history)"""
+    own = history_mask(panel)
+    first_row = np.argmax(own, axis=0)
+    return panel[first_row, np.arange(panel.shape[1])]
+
+
+def momentum_indicators(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """Latest momentum indicators for every ticker in the panel in one pass"""
+    current_price = close[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = volume[-1] / rolling_mean(volume[-20:], 20)[-1]
+        return {
+            'current_price': current_price,
+            'daily_return': pct_change(close[-2:])[-1] * 100,
+            'weekly_return': (current_price / close[-5] - 1) * 100,
+            'monthly_return': (current_price / first_value(close) - 1) * 100,
+            'rsi': rsi(close)[-1],
+            'volume_spike': volume_ratio,
+            'above_sma5': current_price > rolling_mean(close[-5:], 5)[-1],
+            'above_sma20': current_price > rolling_mean(close[-20:], 20)[-1]
+        }
+
+
+def moderate_risk_indicators(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Latest returns, volatility, SMA_20 and RSI used by the 10% screen"""
+    current_price = close[-1]
+    returns = pct_change(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(252) * 100  # Annualized volatility
+        return {
+            'current_price': current_price,
+            'weekly_return': (current_price / close[-5] - 1) * 100,
+            'monthly_return': (current_price / close[-21] - 1) * 100,
+            'volatility': volatility,
+            'rsi': rsi(close)[-1],
+            'above_sma20': current_price > rolling_mean(close[-20:], 20)[-1]
+        }
+
+
+def momentum_score(weekly_return, monthly_return, volume_spike, above_sma5, above_sma20):
+    """Momentum ranking score; works on scalars, arrays and Series alike"""
+    return (
+        weekly_return * 0.3 +
+        monthly_return * 0.3 +
+        volume_spike * 10 +
+        above_sma5 * 10 +
+        above_sma20 * 10
+    )
+
+
+class RollingWindow:
+    """Fixed-size ring buffer with an O(1) running sum
+
+    The sum is Neumaier-compensated and recomputed from the buffer every
+    `resync_every` updates, so long intraday streams do not drift. NaNs are
+    counted rather than summed; the mean is NaN while any is in the window,
+    as with a batch rolling mean.
+    """
+
+    def __init__(self, size: int, resync_every: int = 1000):
+        self.size = size
+        self.resync_every = resync_every
+        self.values = [0.0] * size
+        self.count = 0  # values pushed, capped at size
+        self.position = 0  # slot the next value goes into
+        self.nan_count = 0
+        self.nonzero_count = 0  # lets an all-zero window report exactly 0
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._updates = 0
+
+    def push(self, value: float):
+        """Append a value, evicting the oldest once the window is full"""
+        if self.count == self.size:
+            self._remove(self.values[self.position])
+        else:
+            self.count += 1
+        self.values[self.position] = float(value)
+        self._add(value)
+        self.position = (self.position + 1) % self.size
+        self._tick()
+
+    def replace_last(self, value: float):
+        """Overwrite the newest value, e.g. when an intraday tick revises the current bar"""
+        slot = (self.position - 1) % self.size
+        self._remove(self.values[slot])
+        self.values[slot] = float(value)
+        self._add(value)
+        self._tick()
+
+    def last(self, offset: int = 1) -> float:
+        """Value `offset` bars back (1 is the newest); NaN if not in the window"""
+        if offset > self.count:
+            return np.nan
+        return self.values[(self.position - offset) % self.size]
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    def mean(self) -> float:
+        """Mean of a full window; NaN while filling or while it holds a NaN"""
+        if not self.full or self.nan_count:
+            return np.nan
+        if not self.nonzero_count:
+            return 0.0
+        return (self._sum + self._compensation) / self.size
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.nonzero_count += value != 0
+            self._accumulate(value)
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            self.nan_count -= 1
+        else:
+            self.nonzero_count -= value != 0
+            self._accumulate(-value)
+
+    def _accumulate(self, value: float):
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+    def _tick(self):
+        self._updates += 1
+        if self._updates % self.resync_every == 0:
+            self._sum = math.fsum(v for v in self.values[:self.count] if not math.isnan(v))
+            self._compensation = 0.0
+
+
+class IndicatorState:
+    """Incremental momentum indicators for one ticker
+
+    Holds ring buffers for SMA_5, SMA_20, the 14-bar RSI gains/losses, the
+    20-bar volume average and the last `month_bars` closes, so each new bar
+    (or intraday revision of the current bar) updates every indicator in
+    constant time. monthly_return is measured from the oldest close in that
+    window, as the batch path measures it from the first bar of its 1mo
+    window. Fed the same bars, indicators() matches momentum_indicators() on
+    the trailing `month_bars` bars up to floating-point rounding.
+    """
+
+    def __init__(self, rsi_period: int = 14, month_bars: int = MONTH_BARS):
+        self.rsi_period = rsi_period
+        self.closes = RollingWindow(20)  # also serves SMA_20 and the 5-bar lookback
+        self.sma5 = RollingWindow(5)
+        self.volumes = RollingWindow(20)
+        self.gains = RollingWindow(rsi_period)
+        self.losses = RollingWindow(rsi_period)
+        self.month_closes = RollingWindow(month_bars)  # oldest entry is the monthly base
+        self.bars = 0
+
+    @classmethod
+    def from_history(cls, close: np.ndarray, volume: np.ndarray = None, rsi_period: int = 14,
+                     month_bars: int = None) -> 'IndicatorState':
+        """Seed a state by replaying a bar history
+
+        The monthly window defaults to the length of the history, so seeding
+        with a 1mo fetch keeps measuring monthly_return over that many bars.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.full(len(close), np.nan) if volume is None else np.asarray(volume, dtype=np.float64)
+        state = cls(rsi_period, month_bars or max(len(close), 1))
+        for price, size in zip(close, volume):
+            state.update(price, size)
+        return state
+
+    def update(self, close: float, volume: float = np.nan, new_bar: bool = True):
+        """Add a bar, or with new_bar=False revise the latest bar with a fresh tick"""
+        windows = (self.closes, self.sma5, self.volumes, self.gains, self.losses, self.month_closes)
+        if not new_bar and self.bars:
+            previous = self.closes.last(2)
+            gain, loss = self._change(previous, close)
+            for window, value in zip(windows, (close, close, volume, gain, loss, close)):
+                window.replace_last(value)
+            return
+
+        # The first bar has no change; like the batch RSI it counts as a zero gain and loss
+        gain, loss = self._change(self.closes.last(1), close) if self.bars else (0.0, 0.0)
+        for window, value in zip(windows, (close, close, volume, gain, loss, close)):
+            window.push(value)
+        self.bars += 1
+
+    def rsi(self) -> float:
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(100 - 100 / (1 + np.float64(avg_gain) / avg_loss))
+
+    def indicators(self) -> Dict[str, float]:
+        """Latest indicators, keyed like momentum_indicators()"""
+        current_price = self.closes.last(1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'current_price': current_price,
+                'daily_return': (current_price / self.closes.last(2) - 1) * 100,
+                'weekly_return': (current_price / self.closes.last(5) - 1) * 100,
+                'monthly_return': (current_price / self.month_closes.last(self.month_closes.count) - 1) * 100,
+                'rsi': self.rsi(),
+                'volume_spike': float(np.float64(self.volumes.last(1)) / self.volumes.mean()),
+                'above_sma5': bool(current_price > self.sma5.mean()),
+                'above_sma20': bool(current_price > self.closes.mean())
+            }
+
+    @staticmethod
+    def _change(previous: float, close: float) -> Tuple[float, float]:
+        delta = close - previous
+        if math.isnan(delta):
+            return 0.0, 0.0
+        return max(delta, 0.0), max(-delta, 0.0)
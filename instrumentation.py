@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stage-level timing for the analysis pipelines. Off by default: span() then
+# returns a shared no-op and count() returns after one flag check. Set
+# ANALYZER_TRACE=trace.json (or call enable()) to record spans with wall time,
+# CPU time, peak RSS and counters, then export them with write_trace(), which
+# also writes the Prometheus text format next to the JSON trace. Finished
+# spans are always folded into per-name totals (all /metrics needs); the raw
+# records behind the trace file and summary() are kept only while tracing to
+# a file, and at most MAX_SPANS of them, so a long-lived process stays bounded.
+
+TRACE_PATH = os.environ.get('ANALYZER_TRACE')
+MAX_SPANS = 100000
+
+_enabled = bool(TRACE_PATH)
+_record_spans = bool(TRACE_PATH)
+_lock = threading.Lock()
+_local = threading.local()
+_spans = deque(maxlen=MAX_SPANS)  # newest finished span records
+_totals = {}  # span name -> [calls, wall seconds, cpu seconds]
+_counters = {}  # process-wide counter totals
+
+
+def enable(record_spans: bool = False):
+    """Start instrumenting; record_spans also keeps raw span records (implied by ANALYZER_TRACE)"""
+    global _enabled, _record_spans
+    _enabled = True
+    _record_spans = record_spans or bool(TRACE_PATH)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Forget recorded spans and counters"""
+    with _lock:
+        _spans.clear()
+        _totals.clear()
+        _counters.clear()
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Span:
+    """A timed pipeline stage; nest them with `with span(...)`"""
+
+    def __init__(self, name: str, attributes: Dict):
+        self.name = name
+        self.attributes = attributes
+        self.counters = {}
+
+    def __enter__(self) -> 'Span':
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        _local.stack.pop()
+        with _lock:
+            totals = _totals.setdefault(self.name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+        if not _record_spans:
+            return False
+
+        record = {
+            'name': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'start': self.start,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_rss_bytes': _peak_rss_bytes(),
+            'counters': self.counters,
+            'attributes': self.attributes,
+            'error': exc_type.__name__ if exc_type else None
+        }
+        with _lock:
+            _spans.append(record)
+        return False
+
+    def count(self, name: str, value: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def count(self, name: str, value: float = 1):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attributes):
+    """Context manager timing one stage (a no-op unless instrumentation is enabled)"""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping every call of a function in a span"""
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1):
+    """Add to a process-wide counter and to every span currently open on this thread"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+    for open_span in getattr(_local, 'stack', ()):
+        open_span.count(name, value)
+
+
+def spans() -> List[Dict]:
+    """Raw span records, oldest first (empty unless spans are being recorded)"""
+    with _lock:
+        return list(_spans)
+
+
+def span_totals() -> Dict[str, Dict[str, float]]:
+    """Calls, wall and CPU seconds of every finished span, by name"""
+    with _lock:
+        return {name: {'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu}
+                for name, (calls, wall, cpu) in _totals.items()}
+
+
+def counters() -> Dict[str, float]:
+    with _lock:
+        return dict(_counters)
+
+
+def trace() -> Dict:
+    """Recorded spans (in completion order), per-name totals and counter totals"""
+    return {'spans': spans(), 'span_totals': span_totals(), 'counters': counters(),
+            'peak_rss_bytes': _peak_rss_bytes()}
+
+
+def prometheus_text(prefix: str = 'analyzer') -> str:
+    """Span totals and counters in the Prometheus text exposition format"""
+    totals = span_totals()
+
+    lines = []
+    for metric, kind, help_text, column in (
+            ('span_calls_total', 'counter', 'Completed spans per stage', 'calls'),
+            ('span_wall_seconds_total', 'counter', 'Wall-clock seconds per stage', 'wall_seconds'),
+            ('span_cpu_seconds_total', 'counter', 'Process CPU seconds per stage', 'cpu_seconds')):
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, entry in sorted(totals.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{prefix}_{metric}{{span="{label}"}} {entry[column]}')
+
+    for name, value in sorted(counters().items()):
+        metric = f"{prefix}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+
+    peak = _peak_rss_bytes()
+    if peak is not None:
+        lines.append(f"# TYPE {prefix}_peak_rss_bytes gauge")
+        lines.append(f"{prefix}_peak_rss_bytes {peak}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_trace(path: Optional[str] = None) -> Optional[str]:
+    """Write the JSON trace and a .prom file beside it; returns the trace path"""
+    path = path or TRACE_PATH
+    if not _enabled or not path:
+        return None
+    with open(path, 'w') as f:
+        json.dump(trace(), f, indent=2)
+    with open(os.path.splitext(path)[0] + '.prom', 'w') as f:
+        f.write(prometheus_text())
+    return path
+
+
+def summary() -> str:
+    """Indented per-span timing table for printing at the end of a run"""
+    lines = []
+    for record in sorted(spans(), key=lambda r: r['start']):
+        counters_text = ', '.join(f"{k}={v:g}" for k, v in record['counters'].items())
+        rss = record['peak_rss_bytes']
+        lines.append(f"{'  ' * record['depth']}{record['name']}: {record['wall_seconds'] * 1000:.1f}ms wall, "
+                     f"{record['cpu_seconds'] * 1000:.1f}ms cpu"
+                     + (f", peak RSS {rss / 2 ** 20:.0f}MB" if rss else '')
+                     + (f" [{counters_text}]" if counters_text else ''))
+    return '\n'.join(lines)
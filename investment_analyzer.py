@@ -1,23 +1,47 @@
-import yfinance as yf
+from __future__ import annotations
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
-import json
-from typing import Dict, List, Tuple
+from functools import partial
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import warnings
+from instrumentation import count, is_enabled, span, summary, traced, write_trace
+from indicators import IndicatorState, bar_counts, build_panel, momentum_indicators, momentum_score, rsi
+from lazy_import import lazy_import
+from pricing import DAYS_PER_YEAR, VolSurface, black_scholes
+from run_history import HISTORY_DIR, RunHistory
+from simulation import (DEFAULT_CHUNK_SIZE, PERCENTILES, compare_results, generate_paths,
+                        lognormal_terminal_stats, run_blocks, sample_portfolio_values,
+                        terminal_price_stats)
+
+# Data-access dependencies load on first use, so the pricing and probability
+# paths only pay for NumPy (see tests/test_import_time.py)
+pd = lazy_import('pandas')
+
+if TYPE_CHECKING:
+    from bar_store import BarStore
+    from covariance import CovarianceEstimator
+    from earnings_calendar import EarningsCalendar
+    from market_data import MarketDataProvider
+    from option_chain_store import OptionChainStore
+
 warnings.filterwarnings('ignore')
 
 class StockAnalyzer:
     """Analyze real-time stock data for high-momentum opportunities"""
     
-    def __init__(self):
+    def __init__(self, bar_store: BarStore = None, earnings_calendar: EarningsCalendar = None):
+        from bar_store import get_default_store
+        from earnings_calendar import EarningsCalendar
+        
         self.data_cache = {}
+        self.bar_store = bar_store or get_default_store()
+        self.earnings_calendar = earnings_calendar or EarningsCalendar()
+        self.indicator_states = {}  # ticker -> IndicatorState for streaming updates
         
     def get_stock_data(self, ticker: str, period: str = "1mo") -> pd.DataFrame:
-        """Fetch stock data using yfinance"""
+        """Fetch stock data through the shared on-disk bar cache"""
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=period)
+            data = self.bar_store.get_bars(ticker, period)
             self.data_cache[ticker] = data
             return data
         except Exception as e:
@@ -33,68 +57,86 @@ class StockAnalyzer:
             
         if data.empty:
             return {}
-            
-        # Calculate indicators
-        data['Returns'] = data['Close'].pct_change()
-        data['SMA_5'] = data['Close'].rolling(window=5).mean()
-        data['SMA_20'] = data['Close'].rolling(window=20).mean()
-        data['RSI'] = self.calculate_rsi(data['Close'])
-        data['Volume_Ratio'] = data['Volume'] / data['Volume'].rolling(window=20).mean()
         
-        current_price = data['Close'].iloc[-1]
+        df = self.momentum_frame({ticker: data})
+        return df.iloc[0].to_dict() if not df.empty else {}
+    
+    def momentum_frame(self, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Calculate momentum indicators for many stocks in one vectorized pass"""
+        close, tickers = build_panel(frames, 'Close')
+        volume, _ = build_panel(frames, 'Volume')
+        
+        # weekly_return looks 5 bars back, so shorter histories can't be scored
+        enough = bar_counts(close) >= 5
+        for ticker in np.array(tickers)[~enough]:
+            print(f"Not enough data for {ticker}")
+        if not enough.any():
+            return pd.DataFrame()
         
-        return {
-            'ticker': ticker,
-            'current_price': round(current_price, 2),
-            'daily_return': round(data['Returns'].iloc[-1] * 100, 2),
-            'weekly_return': round((data['Close'].iloc[-1] / data['Close'].iloc[-5] - 1) * 100, 2),
-            'monthly_return': round((data['Close'].iloc[-1] / data['Close'].iloc[0] - 1) * 100, 2),
-            'rsi': round(data['RSI'].iloc[-1], 2),
-            'volume_spike': round(data['Volume_Ratio'].iloc[-1], 2),
-            'above_sma5': current_price > data['SMA_5'].iloc[-1],
-            'above_sma20': current_price > data['SMA_20'].iloc[-1]
-        }
+        indicators = momentum_indicators(close[:, enough], volume[:, enough])
+        df = pd.DataFrame({'ticker': np.array(tickers)[enough]})
+        for name, values in indicators.items():
+            df[name] = values if values.dtype == bool else np.round(values, 2)
+        return df
+    
+    def update_bar(self, ticker: str, close: float, volume: float = np.nan,
+                   new_bar: bool = True) -> Dict:
+        """Apply one new bar (or, with new_bar=False, a tick revising the latest bar)
+
+        The first update seeds the ticker's state from its cached history;
+        later ones cost O(1) regardless of history length. Returns the same
+        row as calculate_momentum_indicators.
+        """
+        if ticker not in self.indicator_states:
+            data = self.data_cache.get(ticker)
+            if data is None:
+                data = self.get_stock_data(ticker)
+            if data.empty:
+                self.indicator_states[ticker] = IndicatorState()
+            else:
+                self.indicator_states[ticker] = IndicatorState.from_history(
+                    data['Close'].to_numpy(dtype=np.float64), data['Volume'].to_numpy(dtype=np.float64)
+                )
+        
+        state = self.indicator_states[ticker]
+        state.update(close, volume, new_bar)
+        return {'ticker': ticker, **{name: value if isinstance(value, bool) else round(value, 2)
+                                     for name, value in state.indicators().items()}}
     
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        values = rsi(prices.to_numpy(dtype=np.float64)[:, None], period)[:, 0]
+        return pd.Series(values, index=prices.index)
     
     def get_upcoming_earnings(self, ticker: str) -> Dict:
         """Get upcoming earnings date for a ticker"""
-        try:
-            stock = yf.Ticker(ticker)
-            calendar = stock.calendar
-            if calendar and not calendar.empty:
-                return {
-                    'ticker': ticker,
-                    'earnings_date': calendar.iloc[0, 0] if len(calendar) > 0 else None
-                }
-        except:
-            pass
-        return {'ticker': ticker, 'earnings_date': None}
+        return {'ticker': ticker, 'earnings_date': self.earnings_calendar.get(ticker)}
     
+    def earnings_within(self, tickers: List[str], days: int = 30) -> List[Dict]:
+        """Tickers reporting earnings in the next `days` days, soonest first"""
+        self.earnings_calendar.load(tickers)
+        today = datetime.now().date()
+        wanted = set(tickers)
+        return [{'ticker': t, 'earnings_date': d}
+                for d, t in self.earnings_calendar.between(today, today + timedelta(days=days))
+                if t in wanted]
+    
+    @traced()
     def analyze_multiple_stocks(self, tickers: List[str]) -> pd.DataFrame:
         """Analyze multiple stocks and return sorted by momentum"""
-        results = []
-        for ticker in tickers:
-            indicators = self.calculate_momentum_indicators(ticker)
-            if indicators:
-                results.append(indicators)
-        
-        df = pd.DataFrame(results)
+        # One bulk fetch for the whole list instead of a round-trip per ticker
+        self.data_cache.update(self.bar_store.get_many(tickers))
+        frames = {t: self.data_cache[t] for t in tickers if t in self.data_cache}
+        return self.score_momentum(frames)
+    
+    def score_momentum(self, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Momentum indicators and score for 1mo of bars per ticker, best first"""
+        df = self.momentum_frame(frames)
         if not df.empty:
             # Score stocks based on momentum factors
-            df['momentum_score'] = (
-                df['weekly_return'] * 0.3 +
-                df['monthly_return'] * 0.3 +
-                df['volume_spike'] * 10 +
-                df['above_sma5'].astype(int) * 10 +
-                df['above_sma20'].astype(int) * 10
+            df['momentum_score'] = momentum_score(
+                df['weekly_return'], df['monthly_return'], df['volume_spike'],
+                df['above_sma5'].astype(int), df['above_sma20'].astype(int)
             )
             df = df.sort_values('momentum_score', ascending=False)
         return df
@@ -103,8 +145,60 @@ class StockAnalyzer:
 class OptionsCalculator:
     """Calculate options profit/loss for Level 1 strategies (long calls/puts only)"""
     
-    def __init__(self):
+    def __init__(self, provider: MarketDataProvider = None, chain_store: OptionChainStore = None):
         self.risk_free_rate = 0.05  # 5% annual risk-free rate
+        self._provider = provider  # created on first chain fetch
+        self._chain_store = chain_store
+        
+    @property
+    def provider(self) -> MarketDataProvider:
+        if self._provider is None:
+            from market_data import default_provider
+            self._provider = default_provider()
+        return self._provider
+    
+    @property
+    def chain_store(self) -> OptionChainStore:
+        if self._chain_store is None:
+            from option_chain_store import OptionChainStore
+            self._chain_store = OptionChainStore()
+        return self._chain_store
+        
+    def price_options(self, stock_price, strike, days_to_expiry, volatility,
+                      right='call') -> Dict[str, np.ndarray]:
+        """Black-Scholes prices and Greeks for arrays of contracts (expiry in calendar days)"""
+        return black_scholes(stock_price, strike, np.asarray(days_to_expiry) / DAYS_PER_YEAR,
+                             volatility, self.risk_free_rate, right)
+        
+    @traced()
+    def load_vol_surface(self, ticker: str, stock_price: float,
+                         max_expiries: int = 6) -> Optional[VolSurface]:
+        """Implied-volatility surface from the listed call chain (mid prices)
+        
+        Reads the option-chain store; today's snapshot is fetched from the
+        market-data provider first if the store lacks it. Offline providers
+        have no chains, so the newest stored snapshot (if any) is used.
+        """
+        try:
+            today = pd.Timestamp.now().normalize()
+            if self.chain_store.resolve_snapshot(ticker) != today.strftime('%Y-%m-%d'):
+                chain = self.provider.fetch_option_chain(ticker, max_expiries)
+                if not chain.empty:
+                    self.chain_store.ingest(ticker, today, chain, stock_price)
+            calls = self.chain_store.query(ticker, 'call', min_dte=1)
+            if calls.empty:
+                return None
+            calls = calls[calls['expiry'].isin(calls['expiry'].unique()[:max_expiries])]
+            prices = calls['mid'] if 'mid' in calls else calls['last']
+            if 'last' in calls:
+                prices = prices.where(prices > 0, calls['last'])
+            return VolSurface.from_chain(
+                stock_price, calls['strike'].to_numpy(), calls['dte'].to_numpy(),
+                prices.to_numpy(dtype=np.float64), 'call', self.risk_free_rate
+            )
+        except Exception as e:
+            print(f"Error building volatility surface for {ticker}: {e}")
+            return None
         
     def calculate_call_profit(self, stock_price: float, strike: float, premium: float, 
                              target_price: float, contracts: int = 1) -> Dict:
@@ -152,36 +246,88 @@ class OptionsCalculator:
             'breakeven': strike - premium
         }
     
+    @traced()
+    def search_call_grid(self, stock_price: float, target_moves, strike_offsets,
+                         days_to_expiry, capital, target_return: float = 0.43,
+                         volatility=0.30, top_k: int = 10, sort_by: str = 'return_pct',
+                         min_premium: float = 0.01) -> pd.DataFrame:
+        """Evaluate long calls over every (move, strike offset, expiry, capital) combination
+
+        The cartesian product is evaluated with broadcasting: premiums are
+        priced once per (strike offset, expiry) and contract counts, costs and
+        profits per grid cell. `volatility` may be a scalar or an array
+        broadcastable to (strike offsets, expiries). Contracts priced below
+        `min_premium` (one tick) are not tradable and are skipped. Returns the
+        `top_k` feasible candidates by `sort_by`, or all of them in grid order
+        if `top_k` is None.
+        """
+        moves = np.asarray(target_moves, dtype=np.float64).reshape(-1, 1, 1, 1)
+        offsets = np.asarray(strike_offsets, dtype=np.float64).reshape(-1, 1)
+        expiries = np.asarray(days_to_expiry, dtype=np.float64).reshape(1, -1)
+        capital = np.asarray(capital, dtype=np.float64).reshape(1, 1, 1, -1)
+
+        strikes = stock_price * (1 + offsets)
+        premiums = self.price_options(stock_price, strikes, expiries, volatility)['price']
+        premiums = np.broadcast_to(premiums, (offsets.size, expiries.size))[None, :, :, None]
+        strikes = strikes[None, :, :, None]
+        target_prices = stock_price * (1 + moves)
+
+        # Contracts needed to earn target_return on the capital at the target price
+        profit_per_contract = (target_prices - strikes - premiums) * 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contracts = np.floor(capital * target_return / profit_per_contract)
+        contracts = np.where(profit_per_contract > 0, contracts, 0)
+        cost = contracts * premiums * 100
+        feasible = (contracts > 0) & (cost <= capital) & (premiums >= min_premium)
+        profit = (target_prices - strikes) * 100 * contracts - cost
+
+        shape = np.broadcast_shapes(moves.shape, strikes.shape, premiums.shape, capital.shape)
+        columns = {
+            'target_move': moves, 'strike_offset': offsets[None, :, :, None],
+            'days_to_expiry': expiries[None, :, :, None], 'capital': capital,
+            'strike': strikes, 'premium': premiums, 'target_price': target_prices,
+            'contracts': contracts, 'total_cost': cost, 'profit_loss': profit
+        }
+        columns = {name: np.broadcast_to(values, shape).ravel() for name, values in columns.items()}
+        feasible = feasible.ravel()
+
+        if top_k is None:
+            index = np.flatnonzero(feasible)
+        else:
+            score = columns[sort_by] if sort_by != 'return_pct' else columns['profit_loss'] / columns['total_cost']
+            score = np.where(feasible, score, -np.inf)
+            top_k = min(top_k, int(feasible.sum()))
+            index = np.argpartition(-score, top_k - 1)[:top_k] if top_k else np.array([], dtype=np.int64)
+            index = index[np.argsort(-score[index], kind='stable')]
+
+        result = pd.DataFrame({name: values[index] for name, values in columns.items()})
+        result['contracts'] = result['contracts'].astype(np.int64)
+        result['return_pct'] = result['profit_loss'] / result['total_cost'] * 100
+        result['breakeven'] = result['strike'] + result['premium']
+        return result
+    
     def find_optimal_strikes(self, stock_price: float, target_return: float = 0.43,
-                           available_capital: float = 700000) -> List[Dict]:
+                           available_capital: float = 700000, volatility: float = 0.30,
+                           days_to_expiry: int = 30) -> List[Dict]:
         """Find optimal strike prices for target return"""
-        suggestions = []
+        # For calls (bullish plays), ATM and OTM strikes
+        grid = self.search_call_grid(
+            stock_price, [0.10, 0.15, 0.20, 0.25, 0.30], [0, 0.05, 0.10], [days_to_expiry],
+            [available_capital], target_return, volatility, top_k=None
+        )
         
-        # For calls (bullish plays)
-        for price_increase in [0.10, 0.15, 0.20, 0.25, 0.30]:
-            target_price = stock_price * (1 + price_increase)
-            
-            # ATM and OTM strikes
-            for strike_offset in [0, 0.05, 0.10]:
-                strike = stock_price * (1 + strike_offset)
-                
-                # Estimate premium (simplified - real premiums vary)
-                premium = stock_price * 0.02 * (1 + strike_offset * 2)
-                
-                # Calculate how many contracts needed
-                profit_per_contract = (target_price - strike - premium) * 100
-                if profit_per_contract > 0:
-                    contracts_needed = int((available_capital * target_return) / profit_per_contract)
-                    cost = contracts_needed * premium * 100
-                    
-                    if cost <= available_capital:
-                        result = self.calculate_call_profit(
-                            stock_price, strike, premium, target_price, contracts_needed
-                        )
-                        result['price_increase_needed'] = price_increase * 100
-                        suggestions.append(result)
-        
-        return suggestions
+        return [{
+            'strategy': 'Long Call',
+            'stock_price': stock_price,
+            'strike': row.strike,
+            'premium': row.premium,
+            'total_cost': row.total_cost,
+            'target_price': row.target_price,
+            'profit_loss': row.profit_loss,
+            'return_pct': row.return_pct,
+            'breakeven': row.breakeven,
+            'price_increase_needed': row.target_move * 100
+        } for row in grid.itertuples(index=False)]
     
     def calculate_required_move(self, current_capital: float, target_capital: float,
                                option_premium: float, strike: float) -> float:
@@ -199,48 +345,60 @@ class OptionsCalculator:
 class MonteCarloSimulator:
     """Monte Carlo simulation for probability analysis"""
     
-    def __init__(self, num_simulations: int = 10000):
+    def __init__(self, num_simulations: int = 10000, mode: str = 'monte_carlo',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64,
+                 covariance: CovarianceEstimator = None, seed: int = 42, workers: int = 1):
         self.num_simulations = num_simulations
-        
+        self.mode = mode  # 'monte_carlo' simulates paths, 'analytic' uses the lognormal closed form
+        self.chunk_size = chunk_size  # paths generated per block
+        self.dtype = dtype  # np.float32 halves memory for very large runs
+        self.covariance = covariance  # created on first correlated portfolio run
+        self.workers = workers  # processes used for simulation blocks
+        # Every simulation call gets its own child stream of the root seed
+        self.seed_sequence = np.random.SeedSequence(seed)
+        
+    def next_seed(self) -> np.random.SeedSequence:
+        """Spawn an independent seed for the next simulation"""
+        return self.seed_sequence.spawn(1)[0]
+        
+    @traced()
     def simulate_stock_paths(self, current_price: float, volatility: float,
                             days: int = 30, drift: float = 0) -> np.ndarray:
         """Simulate stock price paths using Monte Carlo"""
-        dt = 1/252  # Daily time step (252 trading days per year)
-        
-        # Generate random walks
-        np.random.seed(42)
-        random_shocks = np.random.normal(0, 1, (self.num_simulations, days))
-        
-        # Calculate price paths
-        price_paths = np.zeros((self.num_simulations, days + 1))
-        price_paths[:, 0] = current_price
-        
-        for t in range(1, days + 1):
-            price_paths[:, t] = price_paths[:, t-1] * np.exp(
-                (drift - 0.5 * volatility**2) * dt + 
-                volatility * np.sqrt(dt) * random_shocks[:, t-1]
-            )
-        
-        return price_paths
+        count('paths_simulated', self.num_simulations)
+        return np.concatenate(list(generate_paths(
+            current_price, volatility, days, drift, self.num_simulations,
+            self.chunk_size, self.dtype, rng=np.random.default_rng(self.next_seed())
+        )))
     
+    @traced()
     def calculate_probability_of_target(self, current_price: float, target_price: float,
-                                       volatility: float, days: int = 30) -> Dict:
+                                       volatility: float, days: int = 30,
+                                       mode: str = None) -> Dict:
         """Calculate probability of reaching target price"""
-        paths = self.simulate_stock_paths(current_price, volatility, days)
-        final_prices = paths[:, -1]
-        
-        # Calculate probabilities
-        prob_reach_target = np.mean(final_prices >= target_price) * 100
+        mode = mode or self.mode
+        if mode == 'analytic':
+            stats = lognormal_terminal_stats(current_price, volatility, days,
+                                             thresholds=[target_price])
+        elif mode == 'monte_carlo':
+            # Only final prices are needed, so paths are reduced block by block
+            stats = terminal_price_stats(
+                current_price, volatility, days, thresholds=[target_price],
+                num_simulations=self.num_simulations, chunk_size=self.chunk_size,
+                dtype=self.dtype, seed=self.next_seed(), workers=self.workers
+            )
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
         
-        # Calculate percentiles
-        percentiles = np.percentile(final_prices, [5, 25, 50, 75, 95])
+        prob_reach_target = stats['prob_at_least'][target_price]
+        percentiles = [stats['percentiles'][p] for p in PERCENTILES]
         
         return {
             'current_price': current_price,
             'target_price': target_price,
             'required_return': ((target_price / current_price) - 1) * 100,
             'probability': round(prob_reach_target, 2),
-            'expected_price': round(np.mean(final_prices), 2),
+            'expected_price': round(stats['mean'], 2),
             'percentile_5': round(percentiles[0], 2),
             'percentile_25': round(percentiles[1], 2),
             'median_price': round(percentiles[2], 2),
@@ -248,43 +406,55 @@ class MonteCarloSimulator:
             'percentile_95': round(percentiles[4], 2)
         }
     
-    def portfolio_simulation(self, positions: List[Dict], capital: float = 700000) -> Dict:
-        """Simulate portfolio performance with multiple positions"""
-        portfolio_returns = []
-        
-        for _ in range(self.num_simulations):
-            total_return = 0
-            remaining_capital = capital
-            
-            for position in positions:
-                # Allocate capital
-                allocation = remaining_capital * position['weight']
-                
-                # Simulate return (simplified)
-                volatility = position.get('volatility', 0.3)
-                expected_return = position.get('expected_return', 0)
-                
-                random_return = np.random.normal(expected_return, volatility)
-                position_return = allocation * random_return
-                
-                total_return += position_return
-                
-            portfolio_returns.append(total_return)
-        
-        portfolio_returns = np.array(portfolio_returns)
-        final_values = capital + portfolio_returns
+    def cross_check_probability(self, current_price: float, target_price: float,
+                                volatility: float, days: int = 30) -> Dict:
+        """Compare the analytic and simulated results for the same inputs"""
+        analytic = self.calculate_probability_of_target(
+            current_price, target_price, volatility, days, mode='analytic'
+        )
+        simulated = self.calculate_probability_of_target(
+            current_price, target_price, volatility, days, mode='monte_carlo'
+        )
+        return compare_results(analytic, simulated)
+    
+    @traced()
+    def portfolio_simulation(self, positions: List[Dict], capital: float = 700000,
+                             correlated: bool = False) -> Dict:
+        """Simulate portfolio performance with multiple positions
+        
+        With correlated=True every position needs a 'ticker' and the draws
+        follow the historical return correlation of those tickers.
+        """
+        # Every position is sized off the full starting capital
+        allocations = [capital * position['weight'] for position in positions]
+        volatilities = [position.get('volatility', 0.3) for position in positions]
+        expected_returns = [position.get('expected_return', 0) for position in positions]
+        
+        correlation_factor = None
+        if correlated:
+            if self.covariance is None:
+                from covariance import CovarianceEstimator
+                self.covariance = CovarianceEstimator()
+            tickers = [position['ticker'] for position in positions]
+            correlation_factor = self.covariance.correlation_factor(tickers)
+        
+        sample = partial(sample_portfolio_values, expected_returns, volatilities,
+                         allocations, capital, correlation_factor)
+        stats = run_blocks(sample, self.num_simulations, self.next_seed(), [1000000],
+                           self.chunk_size, self.workers)
+        worst_case, median_value, best_case = stats.percentiles([5, 50, 95])
         
         # Calculate statistics
-        prob_reach_million = np.mean(final_values >= 1000000) * 100
+        prob_reach_million = stats.probabilities()[1000000]
         
         return {
             'initial_capital': capital,
             'target': 1000000,
             'probability_of_success': round(prob_reach_million, 2),
-            'expected_final_value': round(np.mean(final_values), 2),
-            'median_final_value': round(np.median(final_values), 2),
-            'worst_case_5pct': round(np.percentile(final_values, 5), 2),
-            'best_case_95pct': round(np.percentile(final_values, 95), 2)
+            'expected_final_value': round(stats.mean(), 2),
+            'median_final_value': round(median_value, 2),
+            'worst_case_5pct': round(worst_case, 2),
+            'best_case_95pct': round(best_case, 2)
         }
 
 
@@ -310,6 +480,10 @@ def main():
         print(momentum_df[['ticker', 'current_price', 'weekly_return', 
                           'monthly_return', 'momentum_score']].head())
     
+    cache = stock_analyzer.bar_store.cache_stats()
+    print(f"Bar cache: {cache['hits']} hits, {cache['misses']} misses, "
+          f"{cache['bars_fetched']} bars downloaded")
+    
     # Get top stock for detailed analysis
     if not momentum_df.empty:
         top_stock = momentum_df.iloc[0]
@@ -324,7 +498,12 @@ def main():
         
         # Example call option calculation
         strike = current_price * 1.05  # 5% OTM
-        premium = current_price * 0.03  # 3% premium estimate
+        
+        # Implied volatility at this strike, or 30% (typical for growth stocks) without a chain
+        surface = options_calc.load_vol_surface(ticker, current_price)
+        volatility = float(surface.vol(strike, 30)) if surface else 0.30
+        print(f"Volatility: {volatility:.1%} ({'implied' if surface else 'assumed'})")
+        premium = float(options_calc.price_options(current_price, strike, 30, volatility)['price'])
         contracts_needed = int(700000 / (premium * 100))
         
         call_result = options_calc.calculate_call_profit(
@@ -342,8 +521,6 @@ def main():
         print("-" * 40)
         
         # Run Monte Carlo simulation
-        volatility = 0.30  # 30% annual volatility (typical for growth stocks)
-        
         prob_analysis = monte_carlo.calculate_probability_of_target(
             current_price, target_price, volatility, days=30
         )
@@ -383,12 +560,16 @@ def main():
             'portfolio_simulation': portfolio_result
         }
         
-        with open('investment_analysis_results.json', 'w') as f:
-            json.dump(results, f, indent=2)
+        with span('write_results'):
+            run_id = RunHistory().append('investment_analysis', results)
         
         print("\n" + "=" * 60)
-        print("Analysis complete! Results saved to investment_analysis_results.json")
+        print(f"Analysis complete! Run {run_id} saved to {HISTORY_DIR}/investment_analysis/")
         print("=" * 60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with span('investment_analyzer.main'):
+        main()
+    if is_enabled():
+        print(f"\nTrace written to {write_trace()}")
+        print(summary())
\ No newline at end of file
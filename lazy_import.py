@@ -0,0 +1,30 @@
+import sys
+import importlib.util
+from types import ModuleType
+
+
+class _MissingModule(ModuleType):
+    """Stand-in for an uninstalled module that fails when it is actually used"""
+
+    def __getattr__(self, attribute):
+        raise ModuleNotFoundError(f"No module named '{self.__name__}'", name=self.__name__)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module `name`, deferring its execution until an attribute is first used
+
+    Lets the analyzers name pandas/yfinance at module level while pricing and
+    probability paths that never touch them skip their import cost. If the
+    module is not installed, the ImportError is raised on first use instead.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from lazy_import import lazy_import
+
+yf = lazy_import('yfinance')  # only YahooProvider needs it; offline providers work without
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# yfinance period strings mapped to how far back they reach
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_start(period: str, anchor: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Return the first date covered by a yfinance `period` ending at `anchor`"""
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return anchor.normalize().replace(month=1, day=1)
+    return (anchor - PERIOD_OFFSETS[period]).normalize()
+
+
+def align_frames(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Outer-join per-ticker bars into one frame with (field, ticker) columns"""
+    if not frames:
+        return pd.DataFrame()
+    panel = pd.concat(frames, axis=1, names=['Ticker', 'Field'])
+    return panel.swaplevel(axis=1).sort_index(axis=1)
+
+
+class RateLimiter:
+    """Space out request starts so at most `rate` begin per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class MarketDataProvider:
+    """Source of daily OHLCV bars for many tickers at once"""
+
+    def fetch_history(self, tickers: List[str], period: Optional[str] = None,
+                      start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        """Return {ticker: bars} for every ticker that has data"""
+        raise NotImplementedError
+
+    def fetch_panel(self, tickers: List[str], period: str = "1mo") -> pd.DataFrame:
+        """Return one date-aligned frame with (field, ticker) columns"""
+        return align_frames(self.fetch_history(tickers, period=period))
+
+    def fetch_option_chain(self, ticker: str, max_expiries: int = 6) -> pd.DataFrame:
+        """Current listed chain (expiry, strike, right and quote columns, in the
+        layout OptionChainStore.ingest accepts); empty if the source has none"""
+        return pd.DataFrame()
+
+
+class YahooProvider(MarketDataProvider):
+    """Bulk yfinance downloads spread over a bounded, rate-limited thread pool"""
+
+    def __init__(self, batch_size: int = 50, max_workers: int = 4,
+                 requests_per_second: float = 2.0, max_retries: int = 3,
+                 backoff: float = 1.0):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+    def fetch_history(self, tickers: List[str], period: Optional[str] = None,
+                      start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for frames in pool.map(lambda batch: self._fetch_batch(batch, period, start), batches):
+                results.update(frames)
+        return results
+
+    def _fetch_batch(self, tickers: List[str], period: Optional[str],
+                     start: Optional[pd.Timestamp]) -> Dict[str, pd.DataFrame]:
+        """Download one batch, retrying tickers that came back missing"""
+        frames = {}
+        pending = list(tickers)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            self.rate_limiter.wait()
+            try:
+                data = yf.download(
+                    pending, period=None if start is not None else period,
+                    start=start.strftime('%Y-%m-%d') if start is not None else None,
+                    group_by='ticker', auto_adjust=True, threads=False, progress=False
+                )
+            except Exception as e:
+                print(f"Error fetching {', '.join(pending)}: {e}")
+                continue
+
+            for ticker in pending:
+                frame = self._extract(data, ticker)
+                if not frame.empty:
+                    frames[ticker] = frame
+            pending = [t for t in pending if t not in frames]
+            if not pending:
+                break
+
+        for ticker in pending:
+            print(f"Error fetching {ticker}: no data after {self.max_retries} retries")
+        return frames
+
+    def fetch_option_chain(self, ticker: str, max_expiries: int = 6) -> pd.DataFrame:
+        stock = yf.Ticker(ticker)
+        frames = []
+        for expiry in stock.options[:max_expiries]:
+            self.rate_limiter.wait()
+            chain = stock.option_chain(expiry)
+            for right, contracts in (('call', chain.calls), ('put', chain.puts)):
+                frames.append(contracts.assign(expiry=pd.Timestamp(expiry), right=right))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _extract(self, data: pd.DataFrame, ticker: str) -> pd.DataFrame:
+        if data.empty:
+            return pd.DataFrame()
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                return pd.DataFrame()
+            data = data[ticker]
+        frame = data[[c for c in BAR_COLUMNS if c in data.columns]]
+        return frame.dropna(how='all')
+
+
+class LocalFileProvider(MarketDataProvider):
+    """Offline provider reading <TICKER>.csv / <TICKER>.parquet fixtures
+
+    A JSON snapshot shaped like current_market_data.json ({ticker:
+    {current_price, timestamp}}) can be supplied as well; it yields a single
+    bar per ticker. Periods are measured back from each file's last bar so
+    old fixtures still produce full windows.
+    """
+
+    def __init__(self, directory: str, snapshot_path: Optional[str] = None):
+        self.directory = directory
+        self.snapshot_path = snapshot_path
+
+    def fetch_history(self, tickers: List[str], period: Optional[str] = None,
+                      start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        snapshot = self._read_snapshot()
+        results = {}
+        for ticker in tickers:
+            data = self._read_file(ticker)
+            if data is None and ticker in snapshot:
+                data = snapshot[ticker]
+            if data is None or data.empty:
+                continue
+
+            if start is not None:
+                first = start
+            else:
+                first = period_start(period or 'max', data.index[-1])
+            if first is not None:
+                if data.index.tz is not None and first.tzinfo is None:
+                    first = first.tz_localize(data.index.tz)
+                data = data[data.index >= first]
+            if not data.empty:
+                results[ticker] = data
+        return results
+
+    def write(self, ticker: str, data: pd.DataFrame):
+        """Save bars as a CSV fixture readable by this provider"""
+        os.makedirs(self.directory, exist_ok=True)
+        data[[c for c in BAR_COLUMNS if c in data.columns]].to_csv(
+            os.path.join(self.directory, f'{ticker}.csv'), index_label='Date'
+        )
+
+    def _read_file(self, ticker: str) -> Optional[pd.DataFrame]:
+        parquet_path = os.path.join(self.directory, f'{ticker}.parquet')
+        csv_path = os.path.join(self.directory, f'{ticker}.csv')
+        if os.path.exists(parquet_path):
+            data = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            data = pd.read_csv(csv_path, index_col=0)
+        else:
+            return None
+        data.index = pd.to_datetime(data.index, utc=True).tz_convert('America/New_York')
+        return data[[c for c in BAR_COLUMNS if c in data.columns]].sort_index()
+
+    def _read_snapshot(self) -> Dict[str, pd.DataFrame]:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return {}
+        with open(self.snapshot_path) as f:
+            quotes = json.load(f)
+
+        frames = {}
+        for ticker, quote in quotes.items():
+            timestamp = pd.Timestamp(quote['timestamp'].replace(' EST', ''), tz='America/New_York')
+            price = quote['current_price']
+            frames[ticker] = pd.DataFrame(
+                {'Open': [price], 'High': [price], 'Low': [price], 'Close': [price],
+                 'Volume': [float('nan')]},
+                index=pd.DatetimeIndex([timestamp.normalize()], name='Date')
+            )
+        return frames
+
+
+def default_provider() -> MarketDataProvider:
+    """Offline fixtures when MARKET_DATA_DIR is set, otherwise Yahoo Finance"""
+    directory = os.environ.get('MARKET_DATA_DIR')
+    if directory:
+        return LocalFileProvider(directory, os.environ.get('MARKET_DATA_SNAPSHOT'))
+    return YahooProvider()
@@ -0,0 +1,256 @@
+import os
+import re
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+CHAIN_DIR = os.environ.get('OPTION_CHAIN_DIR', 'option_chain_store')
+
+# Quote columns kept per contract, with the names accepted on ingest
+QUOTE_COLUMNS = {
+    'bid': ['bid'],
+    'ask': ['ask'],
+    'last': ['last', 'lastPrice', 'last_price'],
+    'volume': ['volume'],
+    'open_interest': ['open_interest', 'openInterest'],
+    'implied_volatility': ['implied_volatility', 'impliedVolatility', 'iv'],
+}
+SNAPSHOT_FILE = re.compile(r'^(?P<underlying>[A-Za-z.^-]+)_(?P<date>\d{4}-\d{2}-\d{2})\.(csv|parquet)$')
+OPTION_LABEL = re.compile(r'^(?P<month>[A-Za-z]{3}) (?P<day>\d{1,2}) \$(?P<strike>[\d.]+) (?P<right>Call|Put)$')
+
+
+def _day_number(value) -> int:
+    """Days since 1970-01-01 for a date-like value"""
+    return int(pd.Timestamp(value).normalize().value // 86400000000000)
+
+
+class OptionChainStore:
+    """Daily option-chain snapshots stored column by column
+
+    Each snapshot lives in <root>/<UNDERLYING>/<YYYY-MM-DD>/ as one .npy file
+    per column, sorted by (right, expiry, strike). A small group index holds
+    the row offset of every (right, expiry) run, so a query bisects the
+    groups for its DTE window and then bisects strikes inside each group;
+    only the matching rows are read from the memory-mapped columns.
+    """
+
+    def __init__(self, root: str = CHAIN_DIR):
+        self.root = root
+        self._snapshot_dates = {}  # underlying -> sorted list of snapshot dates
+
+    def ingest(self, underlying: str, as_of, chain: pd.DataFrame,
+               underlying_price: Optional[float] = None):
+        """Store one chain snapshot; `chain` needs expiry, strike and right (or type) columns"""
+        as_of = pd.Timestamp(as_of).strftime('%Y-%m-%d')
+        right = chain['right'] if 'right' in chain.columns else chain['type']
+        is_call = right.astype(str).str[0].str.lower().eq('c').to_numpy()
+        expiry = np.array([_day_number(e) for e in chain['expiry']], dtype=np.int32)
+        strike = chain['strike'].to_numpy(dtype=np.float64)
+
+        order = np.lexsort((strike, expiry, ~is_call))  # calls first, then puts
+        columns = {'is_call': is_call[order], 'expiry': expiry[order], 'strike': strike[order]}
+        for name, aliases in QUOTE_COLUMNS.items():
+            source = next((a for a in aliases if a in chain.columns), None)
+            if source is not None:
+                columns[name] = chain[source].to_numpy(dtype=np.float64)[order]
+
+        # (right, expiry) runs: group_start[i]:group_start[i + 1] are the rows of group i
+        keys = columns['expiry'].astype(np.int64) * 2 + (~columns['is_call'])
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+        columns['group_is_call'] = columns['is_call'][starts]
+        columns['group_expiry'] = columns['expiry'][starts]
+        columns['group_start'] = np.append(starts, len(keys)).astype(np.int64)
+
+        # Build the snapshot beside its final location and swap it in whole
+        directory = self._snapshot_dir(underlying, as_of)
+        tmp = directory + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp, f'{name}.npy'), values)
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({'underlying': underlying, 'as_of': as_of, 'rows': int(len(keys)),
+                       'underlying_price': underlying_price}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+        self._snapshot_dates.pop(underlying, None)
+
+    def ingest_file(self, path: str, underlying: Optional[str] = None, as_of=None,
+                    underlying_price: Optional[float] = None):
+        """Ingest a CSV/Parquet chain named <UNDERLYING>_<YYYY-MM-DD>.csv (or pass both explicitly)"""
+        match = SNAPSHOT_FILE.match(os.path.basename(path))
+        if underlying is None or as_of is None:
+            if match is None:
+                raise ValueError(f"Cannot infer underlying and date from {path}")
+            underlying = underlying or match.group('underlying')
+            as_of = as_of or match.group('date')
+        chain = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        if underlying_price is None and 'underlying_price' in chain.columns:
+            underlying_price = float(chain['underlying_price'].iloc[0])
+        self.ingest(underlying, as_of, chain, underlying_price)
+
+    def ingest_directory(self, directory: str) -> int:
+        """Ingest every <UNDERLYING>_<YYYY-MM-DD> chain file in `directory`"""
+        count = 0
+        for name in sorted(os.listdir(directory)):
+            if SNAPSHOT_FILE.match(name):
+                try:
+                    self.ingest_file(os.path.join(directory, name))
+                    count += 1
+                except Exception as e:
+                    print(f"Error ingesting {name}: {e}")
+        return count
+
+    def snapshots(self, underlying: str) -> List[str]:
+        """Sorted snapshot dates (YYYY-MM-DD) stored for `underlying`"""
+        if underlying not in self._snapshot_dates:
+            directory = os.path.join(self.root, underlying)
+            names = os.listdir(directory) if os.path.isdir(directory) else []
+            self._snapshot_dates[underlying] = sorted(n for n in names if not n.endswith('.tmp'))
+        return self._snapshot_dates[underlying]
+
+    def resolve_snapshot(self, underlying: str, as_of=None) -> Optional[str]:
+        """Latest snapshot date on or before `as_of` (the newest one if None)"""
+        dates = self.snapshots(underlying)
+        if as_of is None:
+            return dates[-1] if dates else None
+        position = bisect_right(dates, pd.Timestamp(as_of).strftime('%Y-%m-%d'))
+        return dates[position - 1] if position else None
+
+    def query(self, underlying: str, right: Optional[str] = 'call', min_dte: int = 0,
+              max_dte: Optional[int] = None, moneyness: Optional[Tuple[float, float]] = None,
+              strike_range: Optional[Tuple[float, float]] = None, as_of=None,
+              spot: Optional[float] = None) -> pd.DataFrame:
+        """Contracts in a DTE window and strike band from the snapshot in effect at `as_of`
+
+        `moneyness` is a (low, high) strike/spot band such as (0.9, 1.1); the
+        spot defaults to the underlying price recorded with the snapshot.
+        `right` is 'call', 'put' or None for both.
+        """
+        snapshot = self.resolve_snapshot(underlying, as_of)
+        if snapshot is None:
+            return pd.DataFrame()
+        directory = self._snapshot_dir(underlying, snapshot)
+        meta = self._read_meta(directory)
+
+        low_strike, high_strike = strike_range or (-np.inf, np.inf)
+        if moneyness is not None:
+            spot = spot if spot is not None else meta.get('underlying_price')
+            if spot is None:
+                raise ValueError(f"No underlying price stored for {underlying} {snapshot}; pass spot")
+            low_strike, high_strike = max(low_strike, moneyness[0] * spot), min(high_strike, moneyness[1] * spot)
+
+        day = _day_number(snapshot)
+        first_expiry = day + min_dte
+        last_expiry = day + max_dte if max_dte is not None else np.iinfo(np.int32).max
+
+        group_is_call = self._load(directory, 'group_is_call')
+        group_expiry = self._load(directory, 'group_expiry')
+        group_start = self._load(directory, 'group_start')
+        strikes = self._load(directory, 'strike')
+
+        # Groups are sorted calls-then-puts, each half by expiry
+        calls_end = int(np.count_nonzero(group_is_call))
+        halves = {'call': [(0, calls_end)], 'put': [(calls_end, len(group_is_call))]}
+        if right:
+            segments = halves['call' if right.lower().startswith('c') else 'put']
+        else:
+            segments = halves['call'] + halves['put']
+
+        slices = []
+        for lo, hi in segments:
+            first = lo + int(np.searchsorted(group_expiry[lo:hi], first_expiry, side='left'))
+            last = lo + int(np.searchsorted(group_expiry[lo:hi], last_expiry, side='right'))
+            for group in range(first, last):
+                start, end = int(group_start[group]), int(group_start[group + 1])
+                row_lo = start + int(np.searchsorted(strikes[start:end], low_strike, side='left'))
+                row_hi = start + int(np.searchsorted(strikes[start:end], high_strike, side='right'))
+                if row_hi > row_lo:
+                    slices.append((row_lo, row_hi))
+
+        rows = np.concatenate([np.arange(a, b) for a, b in slices]) if slices else np.array([], dtype=np.int64)
+        expiry = self._load(directory, 'expiry')[rows].astype(np.int64)
+        result = pd.DataFrame({
+            'underlying': underlying,
+            'as_of': pd.Timestamp(snapshot),
+            'expiry': pd.to_datetime(expiry, unit='D'),
+            'dte': expiry - day,
+            'strike': strikes[rows],
+            'right': np.where(self._load(directory, 'is_call')[rows], 'call', 'put'),
+        })
+        for name in QUOTE_COLUMNS:
+            path = os.path.join(directory, f'{name}.npy')
+            if os.path.exists(path):
+                result[name] = np.load(path, mmap_mode='r')[rows]
+        if 'bid' in result.columns and 'ask' in result.columns:
+            result['mid'] = (result['bid'] + result['ask']) / 2
+        return result
+
+    def quote(self, underlying: str, expiry, strike: float, right: str = 'call',
+              as_of=None) -> Optional[Dict]:
+        """Single contract from the snapshot in effect at `as_of`, or None if not listed"""
+        snapshot = self.resolve_snapshot(underlying, as_of)
+        if snapshot is None:
+            return None
+        dte = _day_number(expiry) - _day_number(snapshot)
+        if dte < 0:
+            return None
+        matches = self.query(underlying, right, dte, dte, strike_range=(strike, strike), as_of=snapshot)
+        return matches.iloc[0].to_dict() if len(matches) else None
+
+    def _snapshot_dir(self, underlying: str, as_of: str) -> str:
+        return os.path.join(self.root, underlying, as_of)
+
+    def _read_meta(self, directory: str) -> Dict:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            return json.load(f)
+
+    def _load(self, directory: str, column: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f'{column}.npy'), mmap_mode='r')
+
+
+def parse_option_label(label: str, as_of=None) -> Optional[Tuple[pd.Timestamp, float, str]]:
+    """Parse labels like "Feb 21 $430 Call" into (expiry, strike, right)
+
+    The expiry year is the first one on or after `as_of` (default today).
+    Labels without a concrete contract ("Weekly ATM Calls") return None.
+    """
+    match = OPTION_LABEL.match(label.strip())
+    if match is None:
+        return None
+    as_of = pd.Timestamp(as_of or date.today()).normalize()
+    expiry = pd.Timestamp(f"{match.group('month')} {match.group('day')} {as_of.year}")
+    if expiry < as_of:
+        expiry = expiry.replace(year=as_of.year + 1)
+    return expiry, float(match.group('strike')), match.group('right').lower()
+
+
+def refresh_premiums(strategies: List[Dict], store: Optional[OptionChainStore] = None,
+                     as_of=None) -> int:
+    """Replace literal option_premium values with stored mid prices where a snapshot has the contract
+
+    Updated strategies get 'premium_as_of' set to the snapshot date. Returns
+    the number of strategies updated.
+    """
+    store = store or OptionChainStore()
+    updated = 0
+    for strategy in strategies:
+        snapshot = store.resolve_snapshot(strategy.get('ticker', ''), as_of)
+        contract = parse_option_label(strategy.get('option', ''), snapshot) if snapshot else None
+        if contract is None:
+            continue
+        quote = store.quote(strategy['ticker'], *contract, as_of=snapshot)
+        if quote is None:
+            continue
+        premium = quote.get('mid', quote.get('last'))
+        if premium is None or not np.isfinite(premium) or premium <= 0:
+            premium = quote.get('last')
+        if premium is not None and np.isfinite(premium) and premium > 0:
+            strategy['option_premium'] = round(float(premium), 2)
+            strategy['premium_as_of'] = snapshot
+            updated += 1
+    return updated
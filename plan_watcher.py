@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import select
+import struct
+import difflib
+import hashlib
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Shared watcher for the project-plan monitors. It waits on kernel change
+# notifications (inotify through ctypes on Linux, watchdog elsewhere when it
+# is installed) and falls back to stat polling. A change is confirmed by
+# size/mtime, then a streamed blake2b hash, and reported as a unified diff of
+# the changed lines only.
+
+PLAN_PATH = os.environ.get('PROJECT_PLAN_PATH', r"C:\Users\ebalo\claude_stuff\project_plan.txt")
+READ_CHUNK = 64 * 1024
+
+
+def timestamp() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class _PollingBackend:
+    """Wakes every `interval` seconds; the watcher then compares stat results"""
+
+    name = 'polling'
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(min(timeout, self.interval))
+        return False
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """inotify watch on the file's directory, so editors that save by rename are seen"""
+
+    name = 'inotify'
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    _EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+    def __init__(self, path: str):
+        import ctypes
+        import ctypes.util
+
+        self.filename = os.fsencode(os.path.basename(path))
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (self.IN_MODIFY | self.IN_ATTRIB | self.IN_CLOSE_WRITE | self.IN_MOVED_FROM
+                | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE)
+        directory = os.path.dirname(os.path.abspath(path))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"Cannot watch {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        """True if an event for the watched file arrived within `timeout` seconds"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset, relevant = 0, False
+        while offset < len(buffer):
+            _, _, _, length = self._EVENT.unpack_from(buffer, offset)
+            offset += self._EVENT.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            relevant |= name == self.filename
+        return relevant
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _WatchdogBackend:
+    """watchdog observer on the file's directory (macOS, Windows)"""
+
+    name = 'watchdog'
+
+    def __init__(self, path: str):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        target = os.path.normcase(os.path.abspath(path))
+        triggered = self._triggered = threading.Event()
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = (event.src_path, getattr(event, 'dest_path', ''))
+                if any(p and os.path.normcase(os.path.abspath(p)) == target for p in paths):
+                    triggered.set()
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), os.path.dirname(target))
+        self._observer.start()
+
+    def wait(self, timeout: float) -> bool:
+        triggered = self._triggered.wait(timeout)
+        self._triggered.clear()
+        return triggered
+
+    def close(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+def open_backend(path: str, poll_interval: float = 0.5):
+    """Best available change-notification backend for `path`"""
+    factories = [_InotifyBackend] if sys.platform.startswith('linux') else []
+    factories.append(_WatchdogBackend)
+    for factory in factories:
+        try:
+            return factory(path)
+        except (ImportError, OSError, AttributeError):
+            continue
+    return _PollingBackend(poll_interval)
+
+
+class PlanWatcher:
+    """Watch one text file and report each change as a unified diff
+
+    `changes()` blocks between changes. With a notification backend it wakes
+    only on events for the file (after `debounce` seconds of quiet, so an
+    editor's burst of writes is one change) plus a stat check every
+    `rescan_interval` seconds in case an event was missed; the polling
+    fallback stats the file every `poll_interval` seconds.
+    """
+
+    def __init__(self, path: str = PLAN_PATH, poll_interval: float = 0.5,
+                 debounce: float = 0.1, rescan_interval: float = 30.0, context: int = 3):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.rescan_interval = rescan_interval
+        self.context = context
+        self._backend = None
+        self._stat = None  # (size, mtime_ns) of the last read
+        self._digest = None
+        self.content = None  # None while the file is missing
+
+    @property
+    def backend(self) -> str:
+        """Name of the change-notification backend in use"""
+        return self._open().name
+
+    def snapshot(self) -> Optional[str]:
+        """Read the current content as the baseline for later diffs"""
+        state = self._read()
+        if state is not None:
+            self._stat, self._digest, self.content = state
+        return self.content
+
+    def check(self) -> Optional[Dict]:
+        """Compare the file with the last snapshot; a change dict if its content changed"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self.content is None:
+                return None
+            return self._change('deleted', None, None, None)
+        except OSError as e:
+            print(f"[{timestamp()}] Error checking {self.path}: {e}")
+            return None
+
+        if (stat.st_size, stat.st_mtime_ns) == self._stat and self.content is not None:
+            return None
+        state = self._read()
+        if state is None:
+            return None
+        key, digest, content = state
+        if digest == self._digest:
+            self._stat = key  # touched or rewritten with the same bytes
+            return None
+        return self._change('created' if self.content is None else 'modified', key, digest, content)
+
+    def changes(self) -> Iterator[Dict]:
+        """Yield a change dict for every content change, forever"""
+        if self._stat is None and self.content is None:
+            self.snapshot()
+        backend = self._open()
+        while True:
+            if backend.wait(self.rescan_interval):
+                while backend.wait(self.debounce):
+                    pass
+            change = self.check()
+            if change:
+                yield change
+
+    def watch(self, callback: Callable[[Dict], None]):
+        """Call `callback(change)` for every change until interrupted"""
+        try:
+            for change in self.changes():
+                callback(change)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+    def _open(self):
+        if self._backend is None:
+            self._backend = open_backend(self.path, self.poll_interval)
+        return self._backend
+
+    def _read(self) -> Optional[Tuple[Tuple[int, int], bytes, str]]:
+        """((size, mtime_ns), blake2b digest, text) read in one streamed pass"""
+        hasher = hashlib.blake2b(digest_size=16)
+        data = bytearray()
+        try:
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+                    hasher.update(chunk)
+                    data += chunk
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"[{timestamp()}] Error reading {self.path}: {e}")
+            return None
+        return (stat.st_size, stat.st_mtime_ns), hasher.digest(), data.decode('utf-8', errors='replace')
+
+    def _change(self, status: str, key, digest, content: Optional[str]) -> Dict:
+        previous = self.content
+        old_lines = self._lines(previous)
+        new_lines = self._lines(content)
+        diff = list(difflib.unified_diff(old_lines, new_lines, fromfile=f'{self.path} (before)',
+                                         tofile=self.path, n=self.context))
+        self._stat, self._digest, self.content = key, digest, content
+        return {
+            'path': self.path,
+            'status': status,
+            'timestamp': datetime.now().isoformat(),
+            'previous': previous,
+            'content': content,
+            'diff': ''.join(diff),
+            'lines_added': sum(1 for line in diff if line.startswith('+') and not line.startswith('+++')),
+            'lines_removed': sum(1 for line in diff if line.startswith('-') and not line.startswith('---'))
+        }
+
+    @staticmethod
+    def _lines(text: Optional[str]):
+        # Terminate every line so the diff output stays one line per entry
+        return [line + '\n' for line in (text or '').splitlines()]
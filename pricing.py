@@ -0,0 +1,203 @@
+import numpy as np
+from typing import Dict
+from normal_dist import norm_cdf, norm_pdf
+
+DAYS_PER_YEAR = 365  # option expiries are quoted in calendar days
+
+
+def _is_call(right) -> np.ndarray:
+    """Accept 'call'/'put' (or 'C'/'P'), arrays of those, or a boolean is-call array"""
+    right = np.asarray(right)
+    if right.dtype == bool:
+        return right
+    return np.char.lower(right.astype(str)).astype('U1') == 'c'
+
+
+def black_scholes(spot, strike, expiry, volatility, rate: float = 0.05,
+                  right='call', dividend_yield: float = 0.0) -> Dict[str, np.ndarray]:
+    """Black-Scholes price and Greeks for arrays of European options
+
+    All inputs broadcast against each other, so whole strike/expiry grids are
+    priced in one call. `expiry` is in years and `volatility` is annualized
+    (0.30 = 30%). Greeks are per unit: theta is per year and vega per 1.00 of
+    volatility; divide by 365 and 100 for per-day and per-vol-point figures.
+    Expired or zero-volatility contracts are valued at discounted intrinsic value.
+    """
+    spot = np.asarray(spot, dtype=np.float64)
+    strike = np.asarray(strike, dtype=np.float64)
+    expiry = np.asarray(expiry, dtype=np.float64)
+    volatility = np.asarray(volatility, dtype=np.float64)
+    is_call = _is_call(right)
+
+    live = (expiry > 0) & (volatility > 0)
+    t = np.where(live, expiry, 1.0)
+    sigma = np.where(live, volatility, 1.0)
+    sqrt_t = np.sqrt(t)
+    spot_discount = np.exp(-dividend_yield * t)
+    strike_discount = np.exp(-rate * t)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * sigma ** 2) * t) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    n_d1 = norm_cdf(d1)
+    n_d2 = norm_cdf(d2)
+    pdf_d1 = norm_pdf(d1)
+
+    call_price = spot * spot_discount * n_d1 - strike * strike_discount * n_d2
+    put_price = call_price - spot * spot_discount + strike * strike_discount  # put-call parity
+    price = np.where(is_call, call_price, put_price)
+    delta = np.where(is_call, spot_discount * n_d1, spot_discount * (n_d1 - 1))
+    gamma = spot_discount * pdf_d1 / (spot * sigma * sqrt_t)
+    vega = spot * spot_discount * pdf_d1 * sqrt_t
+    decay = -spot * spot_discount * pdf_d1 * sigma / (2 * sqrt_t)
+    call_theta = (decay - rate * strike * strike_discount * n_d2
+                  + dividend_yield * spot * spot_discount * n_d1)
+    put_theta = (decay + rate * strike * strike_discount * (1 - n_d2)
+                 - dividend_yield * spot * spot_discount * (1 - n_d1))
+    theta = np.where(is_call, call_theta, put_theta)
+
+    if not live.all():
+        # Expired (or zero-vol) contracts collapse to discounted intrinsic value
+        forward = spot * np.exp((rate - dividend_yield) * np.maximum(expiry, 0))
+        intrinsic = np.where(is_call, np.maximum(forward - strike, 0), np.maximum(strike - forward, 0))
+        intrinsic = intrinsic * np.exp(-rate * np.maximum(expiry, 0))
+        in_the_money = np.where(is_call, forward > strike, forward < strike)
+        price = np.where(live, price, intrinsic)
+        delta = np.where(live, delta, np.where(in_the_money, np.where(is_call, 1.0, -1.0), 0.0))
+        gamma = np.where(live, gamma, 0.0)
+        vega = np.where(live, vega, 0.0)
+        theta = np.where(live, theta, 0.0)
+
+    return {'price': price, 'delta': delta, 'gamma': gamma, 'theta': theta, 'vega': vega}
+
+
+def _price_bounds(spot, strike, expiry, rate, is_call, dividend_yield):
+    """No-arbitrage lower and upper bounds on European option prices"""
+    forward_spot = spot * np.exp(-dividend_yield * expiry)
+    discounted_strike = strike * np.exp(-rate * expiry)
+    lower = np.where(is_call, np.maximum(forward_spot - discounted_strike, 0),
+                     np.maximum(discounted_strike - forward_spot, 0))
+    upper = np.where(is_call, forward_spot, discounted_strike)
+    return lower, upper
+
+
+def implied_volatility(price, spot, strike, expiry, rate: float = 0.05, right='call',
+                       dividend_yield: float = 0.0, tol: float = 1e-8, max_iter: int = 100,
+                       min_vol: float = 1e-4, max_vol: float = 5.0, vol_tol: float = 1e-4) -> np.ndarray:
+    """Invert Black-Scholes prices for whole option chains at once
+
+    Runs a safeguarded Newton iteration on every quote together: each element
+    keeps its own [low, high] volatility bracket, steps that leave the bracket
+    (tiny vega on deep ITM/OTM contracts) fall back to bisection, and
+    converged elements drop out of the active set. Quotes outside the
+    no-arbitrage bounds, or needing a volatility outside [min_vol, max_vol],
+    come back as NaN. So do quotes the price tolerance cannot resolve: time
+    value above the bound within `tol`, or a vega so small that `tol` in
+    price spans more than `vol_tol` in volatility.
+    """
+    price, spot, strike, expiry, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=np.float64), np.asarray(spot, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64), np.asarray(expiry, dtype=np.float64),
+        _is_call(right)
+    )
+    shape = price.shape
+    price, spot, strike, expiry, is_call = (a.ravel() for a in (price, spot, strike, expiry, is_call))
+    result = np.full(price.shape, np.nan)
+
+    lower, upper = _price_bounds(spot, strike, expiry, rate, is_call, dividend_yield)
+    valid = (expiry > 0) & (price - lower > tol) & (price < upper) & (spot > 0) & (strike > 0)
+    active = np.flatnonzero(valid)
+    if not len(active):
+        return result.reshape(shape)
+
+    def price_at(sigma, idx):
+        return black_scholes(spot[idx], strike[idx], expiry[idx], sigma, rate,
+                             is_call[idx], dividend_yield)
+
+    # Quotes the volatility range cannot reach have no solution
+    low = np.full(len(active), min_vol)
+    high = np.full(len(active), max_vol)
+    reachable = ((price_at(low, active)['price'] <= price[active]) &
+                 (price_at(high, active)['price'] >= price[active]))
+    active, low, high = active[reachable], low[reachable], high[reachable]
+
+    # Brenner-Subrahmanyam starting point, kept inside the bracket
+    sigma = np.sqrt(2 * np.pi / expiry[active]) * price[active] / spot[active]
+    sigma = np.clip(sigma, low * 1.01, high * 0.99)
+
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        model = price_at(sigma, active)
+        error = model['price'] - price[active]
+        done = np.abs(error) < tol
+        # Within tol of the quote, but too flat in volatility to pin it down
+        resolved = done & (model['vega'] * vol_tol > tol)
+        result[active[resolved]] = sigma[resolved]
+
+        # Price is increasing in volatility, so the sign of the error narrows the bracket
+        high = np.where(error > 0, sigma, high)
+        low = np.where(error < 0, sigma, low)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            step = sigma - error / model['vega']
+        bisect = ~np.isfinite(step) | (step <= low) | (step >= high)
+        sigma = np.where(bisect, 0.5 * (low + high), step)
+
+        keep = ~done & (high - low > 1e-12)
+        result[active[~done & ~keep]] = sigma[~done & ~keep]
+        active, sigma, low, high = active[keep], sigma[keep], low[keep], high[keep]
+
+    return result.reshape(shape)
+
+
+class VolSurface:
+    """Implied volatility by strike and expiry, interpolated from chain quotes
+
+    Within an expiry, volatility is interpolated linearly in strike (flat
+    beyond the quoted strikes); between expiries, total variance vol^2 * t is
+    interpolated linearly in time, so term structure stays arbitrage-friendly.
+    Expiries are in calendar days.
+    """
+
+    def __init__(self, strikes, days_to_expiry, volatilities):
+        strikes = np.asarray(strikes, dtype=np.float64).ravel()
+        days = np.asarray(days_to_expiry, dtype=np.float64).ravel()
+        volatilities = np.asarray(volatilities, dtype=np.float64).ravel()
+        keep = np.isfinite(volatilities) & np.isfinite(strikes) & (days > 0)
+        if not keep.any():
+            raise ValueError("No valid implied volatilities to build a surface from")
+        strikes, days, volatilities = strikes[keep], days[keep], volatilities[keep]
+
+        order = np.lexsort((strikes, days))
+        strikes, days, volatilities = strikes[order], days[order], volatilities[order]
+        self.expiries, starts = np.unique(days, return_index=True)
+        bounds = np.append(starts, len(days))
+        self._slices = [(strikes[a:b], volatilities[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    @classmethod
+    def from_chain(cls, spot: float, strikes, days_to_expiry, prices, right='call',
+                   rate: float = 0.05, dividend_yield: float = 0.0) -> 'VolSurface':
+        """Solve implied volatilities for a chain snapshot and build the surface"""
+        days_to_expiry = np.asarray(days_to_expiry, dtype=np.float64)
+        volatilities = implied_volatility(prices, spot, strikes, days_to_expiry / DAYS_PER_YEAR,
+                                          rate, right, dividend_yield)
+        return cls(strikes, days_to_expiry, volatilities)
+
+    def vol(self, strike, days_to_expiry) -> np.ndarray:
+        """Volatility at each (strike, days) pair; inputs broadcast"""
+        strike, days = np.broadcast_arrays(np.asarray(strike, dtype=np.float64),
+                                           np.asarray(days_to_expiry, dtype=np.float64))
+        # Smile of every quoted expiry at the requested strikes: (expiries, points)
+        smiles = np.array([np.interp(strike.ravel(), k, v) for k, v in self._slices])
+        if len(self.expiries) == 1:
+            return smiles[0].reshape(strike.shape)
+
+        t = np.clip(days.ravel(), self.expiries[0], self.expiries[-1])
+        upper = np.clip(np.searchsorted(self.expiries, t), 1, len(self.expiries) - 1)
+        lower = upper - 1
+        t0, t1 = self.expiries[lower], self.expiries[upper]
+        columns = np.arange(t.size)
+        w0 = smiles[lower, columns] ** 2 * t0
+        w1 = smiles[upper, columns] ** 2 * t1
+        variance = w0 + (w1 - w0) * (t - t0) / (t1 - t0)
+        return np.sqrt(variance / t).reshape(strike.shape)
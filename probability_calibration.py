@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Empirical replacement for the estimate_probability_10pct heuristic: the
+# share of historical (day, ticker) samples in each volatility x monthly
+# return x RSI bin whose close 21 bars (30 calendar days) later was at least
+# 10% higher. That is the outcome the backtester scores and the Monte Carlo
+# terminal-price probability estimates; a touch of +10% that has faded by
+# then does not count. Build it from the cached bars with
+#
+#   python probability_calibration.py build --period 10y [TICKER ...]
+#
+# and the 10% screen then looks its whole universe up in one bin-index pass.
+
+TABLE_PATH = os.environ.get('PROBABILITY_TABLE', 'probability_table.npz')
+HORIZON_BARS = 21
+TARGET_RETURN = 0.10
+# Samples a bin needs before its own hit rate outweighs the overall rate
+PRIOR_WEIGHT = 20
+
+# Interior bin edges, in the units the screen reports (percent / RSI points)
+DEFAULT_BINS = {
+    'volatility': [15, 20, 25, 30, 40, 50, 70],
+    'monthly_return': [-10, -5, 0, 5, 10, 20],
+    'rsi': [30, 40, 50, 60, 70]
+}
+
+
+class ProbabilityTable:
+    """N-D binned hit-rate table with vectorized lookup
+
+    `edges` holds the interior edges of each feature, so feature i has
+    len(edges[i]) + 1 bins; values below the first edge fall in bin 0 and
+    values at or above the last in the top bin.
+    """
+
+    def __init__(self, features: List[str], edges: List[np.ndarray], counts: np.ndarray,
+                 hits: np.ndarray, meta: Optional[Dict] = None):
+        self.features = list(features)
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.hits = np.asarray(hits, dtype=np.int64)
+        self.meta = meta or {}
+        total = self.counts.sum()
+        self.base_rate = self.hits.sum() / total if total else 0.0
+        # Shrink sparse bins towards the overall rate; stored flat for lookup
+        self.probability = ((self.hits + PRIOR_WEIGHT * self.base_rate)
+                            / (self.counts + PRIOR_WEIGHT) * 100)
+        self._flat = self.probability.ravel()
+
+    @classmethod
+    def from_samples(cls, samples: Dict[str, np.ndarray], hits: np.ndarray,
+                     bins: Dict[str, List[float]] = None, meta: Optional[Dict] = None) -> 'ProbabilityTable':
+        """Count samples and hits per bin; samples with any NaN feature are skipped"""
+        bins = bins or DEFAULT_BINS
+        features = list(bins)
+        edges = [np.asarray(bins[name], dtype=np.float64) for name in features]
+        values = [np.asarray(samples[name], dtype=np.float64).ravel() for name in features]
+        hits = np.asarray(hits, dtype=bool).ravel()
+
+        valid = np.ones(hits.shape, dtype=bool)
+        for column in values:
+            valid &= ~np.isnan(column)
+        shape = tuple(len(e) + 1 for e in edges)
+        index = np.ravel_multi_index(
+            [np.searchsorted(e, v[valid], side='right') for e, v in zip(edges, values)], shape
+        )
+        size = int(np.prod(shape))
+        counts = np.bincount(index, minlength=size).reshape(shape)
+        hit_counts = np.bincount(index, weights=hits[valid], minlength=size).reshape(shape)
+        return cls(features, edges, counts, hit_counts.astype(np.int64), meta)
+
+    def lookup(self, **values) -> np.ndarray:
+        """Probability (%) for each element of the feature arrays; NaN where a feature is NaN"""
+        columns = [np.asarray(values[name], dtype=np.float64) for name in self.features]
+        columns = np.broadcast_arrays(*columns)
+        index = 0
+        missing = np.zeros(columns[0].shape, dtype=bool)
+        for column, edges in zip(columns, self.edges):
+            # Row-major flat index, accumulated one feature at a time
+            index = index * (len(edges) + 1) + np.searchsorted(edges, column, side='right')
+            missing |= np.isnan(column)
+        return np.where(missing, np.nan, self._flat[np.where(missing, 0, index)])
+
+    def save(self, path: str = TABLE_PATH):
+        """Write the table as .npz (via a temp file, so readers never see half of it)"""
+        tmp_path = f"{path}.tmp.npz"
+        arrays = {f'edges_{i}': e for i, e in enumerate(self.edges)}
+        np.savez(tmp_path, features=np.array(self.features), counts=self.counts,
+                 hits=self.hits, meta=np.array(json.dumps(self.meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = TABLE_PATH) -> Optional['ProbabilityTable']:
+        """Read a saved table; None if there is none or it is unreadable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                features = [str(f) for f in data['features']]
+                edges = [data[f'edges_{i}'] for i in range(len(features))]
+                return cls(features, edges, data['counts'], data['hits'],
+                           json.loads(str(data['meta'])))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error loading probability table {path}: {e}")
+            return None
+
+
+def calibrate(backtester, horizon: int = HORIZON_BARS, target_return: float = TARGET_RETURN,
+              step: int = 1, bins: Dict[str, List[float]] = None) -> Optional[ProbabilityTable]:
+    """Build a table from every `step`-th bar of a Backtester's panel
+
+    Features are computed as the 10% screen would have seen them on that
+    day; the outcome is whether the close exactly `horizon` bars later was at
+    least `target_return` higher (not whether any close in between was).
+    Samples overlap when step < horizon.
+    """
+    close = backtester.close
+    rows = np.arange(20, len(close) - horizon, step)
+    if len(rows) == 0:
+        return None
+    samples = backtester.signals(rows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        forward = close[rows + horizon] / close[rows] - 1
+    samples = {name: np.where(np.isnan(forward), np.nan, samples[name]) for name in (bins or DEFAULT_BINS)}
+    meta = {
+        'built_at': datetime.now().isoformat(),
+        'start': backtester.dates[rows[0]].date().isoformat(),
+        'end': backtester.dates[rows[-1]].date().isoformat(),
+        'tickers': len(backtester.tickers),
+        'horizon_bars': horizon,
+        'target_return': target_return,
+        'step': step
+    }
+    return ProbabilityTable.from_samples(samples, forward >= target_return, bins, meta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the 10% probability table")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="calibrate from cached daily bars")
+    build_parser.add_argument('tickers', nargs='*')
+    build_parser.add_argument('--period', default='10y')
+    build_parser.add_argument('--step', type=int, default=1, help="sample every N-th bar")
+    build_parser.add_argument('--output', default=TABLE_PATH)
+
+    show_parser = commands.add_parser('show', help="print a saved table")
+    show_parser.add_argument('--path', default=TABLE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        from backtester import Backtester
+        from realistic_strategy_analyzer import MODERATE_RISK_TICKERS
+
+        tickers = [t.upper() for t in args.tickers] or MODERATE_RISK_TICKERS
+        table = calibrate(Backtester.from_store(tickers, args.period), step=args.step)
+        if table is None:
+            print("Not enough price history to calibrate")
+            sys.exit(1)
+        table.save(args.output)
+        print(f"Calibrated on {table.counts.sum():,} samples from {table.meta['tickers']} tickers "
+              f"({table.meta['start']} to {table.meta['end']}); base rate {table.base_rate:.1%}")
+        print(f"Table saved to {args.output}")
+        return
+
+    table = ProbabilityTable.load(args.path)
+    if table is None:
+        print(f"No probability table at {args.path}")
+        sys.exit(1)
+    print(f"{' x '.join(table.features)} table, base rate {table.base_rate:.1%}, built {table.meta.get('built_at')}")
+    # Marginal hit rate per bin of each feature
+    for axis, (name, edges) in enumerate(zip(table.features, table.edges)):
+        others = tuple(i for i in range(table.counts.ndim) if i != axis)
+        counts, hits = table.counts.sum(axis=others), table.hits.sum(axis=others)
+        labels = [f"< {edges[0]:g}"] + [f"{lo:g}-{hi:g}" for lo, hi in zip(edges[:-1], edges[1:])] \
+            + [f">= {edges[-1]:g}"]
+        print(f"\n{name}:")
+        for label, n, h in zip(labels, counts, hits):
+            print(f"  {label:>10s}: {h / n:6.1%} of {n:,}" if n else f"  {label:>10s}: no samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,146 +1,158 @@
-import yfinance as yf
+from __future__ import annotations
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
-import json
+from functools import partial
+from typing import TYPE_CHECKING
 import warnings
+from instrumentation import is_enabled, span, summary, traced, write_trace
+from indicators import bar_counts, build_panel, moderate_risk_indicators, rsi
+from lazy_import import lazy_import
+from pricing import DAYS_PER_YEAR, black_scholes
+from probability_calibration import TABLE_PATH, ProbabilityTable
+from run_history import HISTORY_DIR, RunHistory
+from simulation import (compare_results, lognormal_terminal_stats, run_blocks,
+                        sample_portfolio_values, terminal_price_stats)
+
+# pandas and the bar store load on first data access (see tests/test_import_time.py)
+pd = lazy_import('pandas')
+
+if TYPE_CHECKING:
+    from bar_store import BarStore
+    from covariance import CovarianceEstimator
+
 warnings.filterwarnings('ignore')
 
+RISK_LABELS = ['Low', 'Medium', 'High']
+
+# Each component scores 1 (best) to 3; the total maps to a risk label
+RISK_THRESHOLDS = {
+    'volatility': [25, 40],  # below the first edge scores 1, below the second 2
+    'monthly_return': [5, 0],  # above the first edge scores 1, above the second 2
+    'rsi': [[40, 60], [30, 70]],  # inside the first band scores 1, the second 2
+    'total': [4, 6]  # at most the first is Low, at most the second Medium
+}
+
 class RealisticStrategyAnalyzer:
     """Analyze realistic 10% monthly return strategies"""
     
-    def __init__(self):
+    def __init__(self, bar_store: BarStore = None, seed: int = 42, workers: int = 1,
+                 probability_table: ProbabilityTable = None, risk_thresholds: dict = None):
+        self._bar_store = bar_store  # default store and covariance are created on first use
+        self._covariance = None
+        self._probability_table = probability_table  # loaded from TABLE_PATH on first use
+        self._probability_table_loaded = probability_table is not None
+        self.workers = workers  # processes used for simulation blocks
+        # Every simulation call gets its own child stream of the root seed
+        self.seed_sequence = np.random.SeedSequence(seed)
         self.target_return = 0.10  # 10% target
         self.initial_capital = 700000
         self.target_capital = 770000
         self.required_profit = 70000
-        
+        self.risk_free_rate = 0.05
+        self.risk_thresholds = risk_thresholds or RISK_THRESHOLDS
+        
+    @property
+    def bar_store(self) -> BarStore:
+        if self._bar_store is None:
+            from bar_store import get_default_store
+            self._bar_store = get_default_store()
+        return self._bar_store
+    
+    @property
+    def covariance(self) -> CovarianceEstimator:
+        if self._covariance is None:
+            from covariance import CovarianceEstimator
+            self._covariance = CovarianceEstimator(self.bar_store)
+        return self._covariance
+    
+    @property
+    def probability_table(self) -> ProbabilityTable:
+        if not self._probability_table_loaded:
+            self._probability_table = ProbabilityTable.load(TABLE_PATH)
+            self._probability_table_loaded = True
+        return self._probability_table
+        
+    @traced()
     def analyze_moderate_risk_stocks(self, tickers: list) -> pd.DataFrame:
         """Analyze stocks for moderate-risk 10% monthly returns"""
-        results = []
-        
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                data = stock.history(period="3mo")
-                
-                if data.empty:
-                    continue
-                    
-                current_price = data['Close'].iloc[-1]
-                
-                # Calculate volatility and returns
-                data['Returns'] = data['Close'].pct_change()
-                weekly_return = (data['Close'].iloc[-1] / data['Close'].iloc[-5] - 1) * 100
-                monthly_return = (data['Close'].iloc[-1] / data['Close'].iloc[-21] - 1) * 100
-                volatility = data['Returns'].std() * np.sqrt(252) * 100  # Annualized volatility
-                
-                # Calculate momentum indicators
-                data['SMA_20'] = data['Close'].rolling(window=20).mean()
-                data['RSI'] = self.calculate_rsi(data['Close'])
-                
-                # Risk assessment for 10% target
-                target_price = current_price * 1.10
-                risk_score = self.calculate_risk_score(volatility, monthly_return, data['RSI'].iloc[-1])
-                
-                results.append({
-                    'ticker': ticker,
-                    'current_price': round(current_price, 2),
-                    'target_price_10pct': round(target_price, 2),
-                    'weekly_return': round(weekly_return, 2),
-                    'monthly_return': round(monthly_return, 2),
-                    'volatility': round(volatility, 2),
-                    'rsi': round(data['RSI'].iloc[-1], 2),
-                    'above_sma20': current_price > data['SMA_20'].iloc[-1],
-                    'risk_score': risk_score,
-                    'probability_10pct': self.estimate_probability_10pct(volatility, monthly_return)
-                })
-                
-            except Exception as e:
-                print(f"Error analyzing {ticker}: {e}")
-                continue
-                
-        df = pd.DataFrame(results)
-        if not df.empty:
-            # Sort by probability of achieving 10% return
-            df = df.sort_values('probability_10pct', ascending=False)
-        return df
+        bars = self.bar_store.get_many(tickers, "3mo")
+        return self.screen_moderate_risk({t: bars[t] for t in tickers if t in bars})
+    
+    def screen_moderate_risk(self, bars: dict) -> pd.DataFrame:
+        """Score 3mo of bars per ticker for the 10% target, best probability first"""
+        close, analyzed = build_panel(bars, 'Close')
+        
+        # monthly_return looks 21 bars back, so shorter histories can't be scored
+        enough = bar_counts(close) >= 21
+        for ticker in np.array(analyzed)[~enough]:
+            print(f"Error analyzing {ticker}: not enough price history")
+        if not enough.any():
+            return pd.DataFrame()
+        
+        indicators = moderate_risk_indicators(close[:, enough])
+        volatility = indicators['volatility']
+        monthly_return = indicators['monthly_return']
+        
+        df = pd.DataFrame({
+            'ticker': np.array(analyzed)[enough],
+            'current_price': np.round(indicators['current_price'], 2),
+            'target_price_10pct': np.round(indicators['current_price'] * 1.10, 2),
+            'weekly_return': np.round(indicators['weekly_return'], 2),
+            'monthly_return': np.round(monthly_return, 2),
+            'volatility': np.round(volatility, 2),
+            'rsi': np.round(indicators['rsi'], 2),
+            'above_sma20': indicators['above_sma20'],
+            # Risk assessment for 10% target
+            'risk_score': score_risk(volatility, monthly_return, indicators['rsi'], self.risk_thresholds),
+            'probability_10pct': self.estimate_probabilities(volatility, monthly_return, indicators['rsi'])
+        })
+        # Sort by probability of achieving 10% return
+        return df.sort_values('probability_10pct', ascending=False)
     
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        values = rsi(prices.to_numpy(dtype=np.float64)[:, None], period)[:, 0]
+        return pd.Series(values, index=prices.index)
     
     def calculate_risk_score(self, volatility: float, monthly_return: float, rsi: float) -> str:
         """Calculate risk score: Low, Medium, High"""
-        score = 0
-        
-        # Volatility component (lower is better for consistent returns)
-        if volatility < 25:
-            score += 1
-        elif volatility < 40:
-            score += 2
-        else:
-            score += 3
-            
-        # Recent performance component
-        if monthly_return > 5:
-            score += 1
-        elif monthly_return > 0:
-            score += 2
-        else:
-            score += 3
-            
-        # RSI component (moderate levels preferred)
-        if 40 <= rsi <= 60:
-            score += 1
-        elif 30 <= rsi <= 70:
-            score += 2
-        else:
-            score += 3
-            
-        if score <= 4:
-            return "Low"
-        elif score <= 6:
-            return "Medium"
-        else:
-            return "High"
+        return str(score_risk(volatility, monthly_return, rsi, self.risk_thresholds))
     
-    def estimate_probability_10pct(self, volatility: float, recent_return: float) -> float:
+    def estimate_probability_10pct(self, volatility: float, recent_return: float,
+                                   rsi: float = np.nan) -> float:
         """Estimate probability of achieving 10% return in 30 days"""
-        # Base probability based on volatility
-        if volatility < 20:
-            base_prob = 25
-        elif volatility < 30:
-            base_prob = 35
-        elif volatility < 40:
-            base_prob = 40
-        else:
-            base_prob = 30
-            
-        # Adjust based on recent performance
-        if recent_return > 10:
-            base_prob += 15
-        elif recent_return > 5:
-            base_prob += 10
-        elif recent_return > 0:
-            base_prob += 5
-        else:
-            base_prob -= 10
-            
-        return min(max(base_prob, 5), 65)  # Cap between 5% and 65%
+        return self.estimate_probabilities(volatility, recent_return, rsi).item()
+    
+    def estimate_probabilities(self, volatility, recent_return, rsi) -> np.ndarray:
+        """Probability (%) of a 10% gain in 30 days for whole arrays of tickers
+
+        Looks each ticker up in the calibrated table when one has been built
+        (see probability_calibration.py); tickers it cannot place, and every
+        ticker when there is no table, get the probability_10pct heuristic.
+        """
+        heuristic = probability_10pct(volatility, recent_return)
+        table = self.probability_table
+        if table is None:
+            return heuristic
+        calibrated = table.lookup(volatility=volatility, monthly_return=recent_return, rsi=rsi)
+        return np.where(np.isnan(calibrated), heuristic, np.round(calibrated, 1))
     
-    def calculate_moderate_options_strategies(self, stock_price: float, ticker: str) -> list:
+    @traced()
+    def calculate_moderate_options_strategies(self, stock_price: float, ticker: str,
+                                              volatility: float = 30.0,
+                                              days_to_expiry: int = 30) -> list:
         """Calculate moderate-risk options strategies for 10% return"""
         strategies = []
         
-        # Strategy 1: At-the-money calls (moderate risk)
+        # Black-Scholes premiums for the ATM and 3% OTM calls (volatility in percent)
         atm_strike = stock_price
-        atm_premium = stock_price * 0.025  # 2.5% premium estimate
+        otm_strike = stock_price * 1.03
+        atm_premium, otm_premium = black_scholes(
+            stock_price, [atm_strike, otm_strike], days_to_expiry / DAYS_PER_YEAR,
+            volatility / 100, self.risk_free_rate
+        )['price'].tolist()
+        
+        # Strategy 1: At-the-money calls (moderate risk)
         target_price = stock_price * 1.10
         
         profit_per_contract = (target_price - atm_strike - atm_premium) * 100
@@ -162,8 +174,6 @@ class RealisticStrategyAnalyzer:
                 })
         
         # Strategy 2: Slightly OTM calls (higher risk/reward)
-        otm_strike = stock_price * 1.03
-        otm_premium = stock_price * 0.015  # 1.5% premium estimate
         
         profit_per_contract = (target_price - otm_strike - otm_premium) * 100
         if profit_per_contract > 0:
@@ -202,33 +212,33 @@ class RealisticStrategyAnalyzer:
         
         return strategies
     
-    def run_monte_carlo_10pct(self, stock_price: float, volatility: float) -> dict:
-        """Run Monte Carlo simulation for 10% target"""
-        num_simulations = 10000
-        days = 30
-        dt = 1/252
-        
+    @traced()
+    def run_monte_carlo_10pct(self, stock_price: float, volatility: float,
+                              mode: str = 'monte_carlo', days: int = 30,
+                              num_simulations: int = 10000) -> dict:
+        """Run Monte Carlo simulation for 10% target
+        
+        mode='analytic' returns the same dict from the exact lognormal
+        distribution of the final price instead of simulating paths.
+        """
         target_price = stock_price * 1.10
+        thresholds = [target_price, stock_price * 1.05, stock_price]
+        
+        if mode == 'analytic':
+            stats = lognormal_terminal_stats(stock_price, volatility / 100, days,
+                                             thresholds=thresholds, percentiles=[25, 50, 75])
+        elif mode == 'monte_carlo':
+            stats = terminal_price_stats(stock_price, volatility / 100, days,
+                                         thresholds=thresholds, percentiles=[25, 50, 75],
+                                         num_simulations=num_simulations,
+                                         seed=self.seed_sequence.spawn(1)[0],
+                                         workers=self.workers)
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
         
-        # Generate price paths
-        np.random.seed(42)
-        random_shocks = np.random.normal(0, 1, (num_simulations, days))
-        
-        price_paths = np.zeros((num_simulations, days + 1))
-        price_paths[:, 0] = stock_price
-        
-        for t in range(1, days + 1):
-            price_paths[:, t] = price_paths[:, t-1] * np.exp(
-                -0.5 * (volatility/100)**2 * dt + 
-                (volatility/100) * np.sqrt(dt) * random_shocks[:, t-1]
-            )
-        
-        final_prices = price_paths[:, -1]
-        
-        # Calculate probabilities
-        prob_10pct = np.mean(final_prices >= target_price) * 100
-        prob_5pct = np.mean(final_prices >= stock_price * 1.05) * 100
-        prob_break_even = np.mean(final_prices >= stock_price) * 100
+        prob_10pct, prob_5pct, prob_break_even = stats['prob_at_least'].values()
+        expected_price = stats['mean']
+        percentile_25, median_price, percentile_75 = stats['percentiles'].values()
         
         return {
             'stock_price': stock_price,
@@ -236,54 +246,162 @@ class RealisticStrategyAnalyzer:
             'prob_10pct': round(prob_10pct, 1),
             'prob_5pct': round(prob_5pct, 1),
             'prob_break_even': round(prob_break_even, 1),
-            'expected_price': round(np.mean(final_prices), 2),
-            'median_price': round(np.median(final_prices), 2),
-            'percentile_25': round(np.percentile(final_prices, 25), 2),
-            'percentile_75': round(np.percentile(final_prices, 75), 2)
+            'expected_price': round(expected_price, 2),
+            'median_price': round(median_price, 2),
+            'percentile_25': round(percentile_25, 2),
+            'percentile_75': round(percentile_75, 2)
         }
     
-    def diversified_portfolio_simulation(self, top_stocks: pd.DataFrame) -> dict:
-        """Simulate diversified portfolio for 10% return"""
+    def cross_check_monte_carlo(self, stock_price: float, volatility: float) -> dict:
+        """Compare the analytic and simulated 10% target results"""
+        analytic = self.run_monte_carlo_10pct(stock_price, volatility, mode='analytic')
+        simulated = self.run_monte_carlo_10pct(stock_price, volatility, mode='monte_carlo')
+        return compare_results(analytic, simulated)
+    
+    @traced()
+    def diversified_portfolio_simulation(self, top_stocks: pd.DataFrame,
+                                         correlated: bool = False,
+                                         num_simulations: int = 10000) -> dict:
+        """Simulate diversified portfolio for 10% return
+        
+        With correlated=True the stocks move together according to their
+        historical return correlation instead of independently.
+        """
         if top_stocks.empty:
             return {}
             
         # Take top 3-5 stocks
         selected_stocks = top_stocks.head(5)
         equal_weight = 1.0 / len(selected_stocks)
+        weights = np.full(len(selected_stocks), equal_weight)
         
-        portfolio_returns = []
+        # Each stock targets a 10% return with half its volatility as noise
+        volatilities = selected_stocks['volatility'].to_numpy(dtype=np.float64) / 100
+        expected_returns = np.full(len(selected_stocks), 0.10)
         
-        for _ in range(10000):
-            total_return = 0
-            
-            for _, stock in selected_stocks.iterrows():
-                # Simulate individual stock return
-                volatility = stock['volatility'] / 100
-                expected_return = 0.10  # Target 10% return
-                
-                # Add some randomness
-                actual_return = np.random.normal(expected_return, volatility/2)
-                position_return = equal_weight * actual_return
-                total_return += position_return
-            
-            portfolio_returns.append(total_return)
+        correlation_factor = None
+        if correlated:
+            correlation_factor = self.covariance.correlation_factor(selected_stocks['ticker'].tolist())
         
-        portfolio_returns = np.array(portfolio_returns)
-        final_values = self.initial_capital * (1 + portfolio_returns)
+        sample = partial(sample_portfolio_values, expected_returns, volatilities / 2,
+                         weights * self.initial_capital, self.initial_capital,
+                         correlation_factor)
+        stats = run_blocks(sample, num_simulations, self.seed_sequence.spawn(1)[0],
+                           [self.target_capital, self.initial_capital], workers=self.workers)
+        prob_reach_target, prob_positive = stats.probabilities().values()
+        worst_case, median_value, best_case = stats.percentiles([5, 50, 95])
         
         return {
             'initial_capital': self.initial_capital,
             'target_capital': self.target_capital,
-            'prob_reach_target': round(np.mean(final_values >= self.target_capital) * 100, 1),
-            'prob_positive': round(np.mean(portfolio_returns > 0) * 100, 1),
-            'expected_return': round(np.mean(portfolio_returns) * 100, 1),
-            'expected_value': round(np.mean(final_values), 2),
-            'worst_case_5pct': round(np.percentile(final_values, 5), 2),
-            'best_case_95pct': round(np.percentile(final_values, 95), 2),
-            'median_value': round(np.median(final_values), 2)
+            'prob_reach_target': round(prob_reach_target, 1),
+            'prob_positive': round(prob_positive, 1),
+            'expected_return': round((stats.mean() / self.initial_capital - 1) * 100, 1),
+            'expected_value': round(stats.mean(), 2),
+            'worst_case_5pct': round(worst_case, 2),
+            'best_case_95pct': round(best_case, 2),
+            'median_value': round(median_value, 2)
         }
 
 
+MODERATE_RISK_TICKERS = [
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META',
+    'JPM', 'JNJ', 'PG', 'KO', 'DIS', 'HD', 'WMT', 'V'
+]
+
+
+def score_risk(volatility, monthly_return, rsi, thresholds: dict = None) -> np.ndarray:
+    """Risk label ('Low'/'Medium'/'High') elementwise over whole columns
+
+    `thresholds` follows RISK_THRESHOLDS. NaN inputs score the worst points
+    of their component, as the scalar comparisons always did.
+    """
+    thresholds = thresholds or RISK_THRESHOLDS
+    volatility = np.asarray(volatility, dtype=np.float64)
+    monthly_return = np.asarray(monthly_return, dtype=np.float64)
+    rsi = np.asarray(rsi, dtype=np.float64)
+    
+    # Volatility component (lower is better for consistent returns)
+    low_vol, mid_vol = thresholds['volatility']
+    score = np.select([volatility < low_vol, volatility < mid_vol], [1, 2], 3)
+    
+    # Recent performance component
+    strong, positive = thresholds['monthly_return']
+    score += np.select([monthly_return > strong, monthly_return > positive], [1, 2], 3)
+    
+    # RSI component (moderate levels preferred)
+    (inner_low, inner_high), (outer_low, outer_high) = thresholds['rsi']
+    score += np.select([(inner_low <= rsi) & (rsi <= inner_high),
+                        (outer_low <= rsi) & (rsi <= outer_high)], [1, 2], 3)
+    
+    low, medium = thresholds['total']
+    return np.array(RISK_LABELS)[np.select([score <= low, score <= medium], [0, 1], 2)]
+
+
+def probability_10pct(volatility, recent_return) -> np.ndarray:
+    """Heuristic probability (%) of a 10% gain in 30 days, elementwise over arrays
+
+    `volatility` is annualized and `recent_return` the monthly return, both in
+    percent; NaN inputs fall through to the last branch of each ladder.
+    """
+    volatility = np.asarray(volatility, dtype=np.float64)
+    recent_return = np.asarray(recent_return, dtype=np.float64)
+    
+    # Base probability based on volatility
+    base_prob = np.select([volatility < 20, volatility < 30, volatility < 40], [25, 35, 40], 30)
+    
+    # Adjust based on recent performance
+    base_prob += np.select([recent_return > 10, recent_return > 5, recent_return > 0], [15, 10, 5], -10)
+    
+    return np.clip(base_prob, 5, 65)  # Cap between 5% and 65%
+
+
+@traced()
+def run_analysis(analyzer: RealisticStrategyAnalyzer = None, tickers: list = None,
+                 volatility: float = None, days: int = 30,
+                 num_simulations: int = 10000) -> dict:
+    """Run the full 10% strategy analysis and return the results dict
+
+    `volatility` (annual, percent) overrides the top stock's historical
+    volatility; `days` is both the option expiry and the Monte Carlo horizon.
+    Returns an empty dict when no stock data is available.
+    """
+    analyzer = analyzer or RealisticStrategyAnalyzer()
+    
+    # Focus on stable, large-cap stocks with growth potential
+    stock_analysis = analyzer.analyze_moderate_risk_stocks(tickers or MODERATE_RISK_TICKERS)
+    if stock_analysis.empty:
+        return {}
+    
+    # Get top stock for detailed analysis
+    top_stock = stock_analysis.iloc[0]
+    ticker = top_stock['ticker']
+    current_price = top_stock['current_price']
+    volatility = volatility if volatility is not None else top_stock['volatility']
+    
+    strategies = analyzer.calculate_moderate_options_strategies(current_price, ticker, volatility,
+                                                                days_to_expiry=days)
+    
+    # The closed form gives the same terminal-price statistics without
+    # simulating 10,000 paths on every dashboard request
+    mc_results = analyzer.run_monte_carlo_10pct(current_price, volatility, mode='analytic', days=days)
+    
+    # Large caps move together, so simulate with their historical correlation
+    portfolio_results = analyzer.diversified_portfolio_simulation(
+        stock_analysis, correlated=True, num_simulations=num_simulations
+    )
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'strategy': 'Realistic 10% Monthly Return',
+        'target_return': 10.0,
+        'top_stocks': stock_analysis.to_dict('records'),
+        'best_options_strategies': strategies,
+        'monte_carlo': mc_results,
+        'portfolio_simulation': portfolio_results
+    }
+
+
 def main():
     """Main analysis for realistic 10% strategy"""
     print("=" * 60)
@@ -292,35 +410,27 @@ def main():
     
     analyzer = RealisticStrategyAnalyzer()
     
-    # Focus on stable, large-cap stocks with growth potential
-    moderate_risk_tickers = [
-        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META',
-        'JPM', 'JNJ', 'PG', 'KO', 'DIS', 'HD', 'WMT', 'V'
-    ]
-    
     print("\n1. ANALYZING MODERATE-RISK STOCKS FOR 10% TARGET")
     print("-" * 50)
     
-    stock_analysis = analyzer.analyze_moderate_risk_stocks(moderate_risk_tickers)
+    results = run_analysis(analyzer)
     
-    if not stock_analysis.empty:
+    if results:
+        stock_analysis = pd.DataFrame(results['top_stocks'])
         print("Top 5 candidates for 10% monthly return:")
         display_cols = ['ticker', 'current_price', 'target_price_10pct', 
                        'monthly_return', 'volatility', 'risk_score', 'probability_10pct']
         print(stock_analysis[display_cols].head())
         
-        # Get top stock for detailed analysis
-        top_stock = stock_analysis.iloc[0]
-        ticker = top_stock['ticker']
-        current_price = top_stock['current_price']
-        volatility = top_stock['volatility']
+        cache = analyzer.bar_store.cache_stats()
+        print(f"Bar cache: {cache['hits']} hits, {cache['misses']} misses, "
+              f"{cache['bars_fetched']} bars downloaded")
         
+        ticker = stock_analysis.iloc[0]['ticker']
         print(f"\n2. OPTIONS STRATEGIES FOR {ticker}")
         print("-" * 40)
         
-        strategies = analyzer.calculate_moderate_options_strategies(current_price, ticker)
-        
-        for strategy in strategies[:3]:  # Show top 3 strategies
+        for strategy in results['best_options_strategies'][:3]:  # Show top 3 strategies
             print(f"\nStrategy: {strategy['strategy']}")
             print(f"Contracts: {strategy['contracts']}")
             print(f"Total Cost: ${strategy['total_cost']:,.2f}")
@@ -330,8 +440,7 @@ def main():
         print(f"\n3. MONTE CARLO ANALYSIS - {ticker}")
         print("-" * 40)
         
-        mc_results = analyzer.run_monte_carlo_10pct(current_price, volatility)
-        
+        mc_results = results['monte_carlo']
         print(f"Current Price: ${mc_results['stock_price']:.2f}")
         print(f"Target Price: ${mc_results['target_price']:.2f}")
         print(f"Probability of 10% gain: {mc_results['prob_10pct']}%")
@@ -342,8 +451,7 @@ def main():
         print("\n4. DIVERSIFIED PORTFOLIO SIMULATION")
         print("-" * 40)
         
-        portfolio_results = analyzer.diversified_portfolio_simulation(stock_analysis)
-        
+        portfolio_results = results['portfolio_simulation']
         if portfolio_results:
             print(f"Initial Capital: ${portfolio_results['initial_capital']:,}")
             print(f"Target Capital: ${portfolio_results['target_capital']:,}")
@@ -355,27 +463,21 @@ def main():
             print(f"Best Case (95%): ${portfolio_results['best_case_95pct']:,.2f}")
         
         # Save results
-        results = {
-            'timestamp': datetime.now().isoformat(),
-            'strategy': 'Realistic 10% Monthly Return',
-            'target_return': 10.0,
-            'top_stocks': stock_analysis.to_dict('records'),
-            'best_options_strategies': strategies,
-            'monte_carlo': mc_results,
-            'portfolio_simulation': portfolio_results
-        }
-        
-        with open('realistic_strategy_results.json', 'w') as f:
-            json.dump(results, f, indent=2)
+        with span('write_results'):
+            run_id = RunHistory().append('realistic_strategy', results)
         
         print("\n" + "=" * 60)
         print(f"SUMMARY: {portfolio_results.get('prob_reach_target', 'N/A')}% probability of reaching $770K target")
         print("This is a much more realistic and achievable strategy!")
-        print("Results saved to realistic_strategy_results.json")
+        print(f"Run {run_id} saved to {HISTORY_DIR}/realistic_strategy/")
         print("=" * 60)
     
     else:
         print("No stock data available for analysis")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with span('realistic_strategy_analyzer.main'):
+        main()
+    if is_enabled():
+        print(f"\nTrace written to {write_trace()}")
+        print(summary())
\ No newline at end of file
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import argparse
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+from lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+# Append-only history of analyzer runs. Each run becomes one .npz file under
+# <root>/<kind>/<YYYY-MM-DD>/ holding every list-of-records section (e.g.
+# top_stocks) as one array per column, plus the remaining sections as JSON.
+# index.jsonl gets one line per run and <root>/<kind>/latest.json a small
+# dashboard-ready summary of the newest run (its index entry, the non-table
+# sections and the top rows of each table); full tables are only read from
+# the .npz when asked for.
+#
+#   history = RunHistory()
+#   history.series('realistic_strategy', 'top_stocks', 'probability_10pct',
+#                  ticker='MSFT', last=90)
+#   python run_history.py show realistic_strategy  # newest full run as JSON
+
+HISTORY_DIR = os.environ.get('RUN_HISTORY_DIR', 'run_history')
+_SUMMARY_KEY = '__summary__'
+_READ_BLOCK = 64 * 1024
+LATEST_ROWS = 10  # table rows copied into latest.json
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _without_nan(value):
+    """NaN (how missing table cells load back) as None, for strict JSON readers"""
+    if isinstance(value, (float, np.floating)) and value != value:
+        return None
+    if isinstance(value, dict):
+        return {k: _without_nan(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_without_nan(v) for v in value]
+    return value
+
+
+def _encode_column(values: List) -> np.ndarray:
+    """Array for one table column: numeric/bool/str as is, None as NaN, anything else as text"""
+    array = np.array(values)
+    if array.dtype.kind in 'biufU':
+        return array
+    if all(v is None or isinstance(v, (int, float)) for v in values):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return np.array(['' if v is None else str(v) for v in values])
+
+
+def _is_table(value) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
+
+
+def _reversed_lines(path: str):
+    """Lines of a file, last first, read backwards a block at a time"""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+        while position > 0:
+            size = min(_READ_BLOCK, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+            remainder = lines.pop(0)  # may continue in the previous block
+            yield from reversed(lines)
+        yield remainder
+
+
+class RunHistory:
+    """Date-partitioned, columnar store of analyzer results with a small query API"""
+
+    def __init__(self, root: str = HISTORY_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.jsonl')
+
+    def append(self, kind: str, results: Dict) -> str:
+        """Store one run's results dict; returns its run id"""
+        now = datetime.now()
+        run_id = now.strftime('%Y%m%dT%H%M%S%f')
+        partition = os.path.join(kind, now.strftime('%Y-%m-%d'))
+        os.makedirs(os.path.join(self.root, partition), exist_ok=True)
+        path = os.path.join(partition, f'{run_id}.npz')
+
+        arrays, tables, summary = {}, {}, {}
+        for name, value in results.items():
+            if _is_table(value):
+                columns = list(dict.fromkeys(key for record in value for key in record))
+                for column in columns:
+                    arrays[f'{name}/{column}'] = _encode_column([record.get(column) for record in value])
+                tables[name] = len(value)
+            else:
+                summary[name] = value
+        arrays[_SUMMARY_KEY] = np.array(json.dumps(summary, default=_json_default))
+
+        # Write-then-rename so readers never see a half-written run
+        full_path = os.path.join(self.root, path)
+        tmp_path = full_path + '.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, full_path)
+
+        entry = {'run_id': run_id, 'kind': kind, 'timestamp': now.isoformat(), 'path': path, 'tables': tables}
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+        # Index entry (so load() accepts it) plus what the dashboard shows:
+        # every non-table section and the first LATEST_ROWS rows of each table
+        latest = os.path.join(self.root, kind, 'latest.json')
+        shown = {name: value[:LATEST_ROWS] if name in tables else value for name, value in results.items()}
+        with open(latest + '.tmp', 'w') as f:
+            json.dump(_without_nan({**entry, 'results': shown}), f, default=_json_default, allow_nan=False)
+        os.replace(latest + '.tmp', latest)
+        return run_id
+
+    def runs(self, kind: Optional[str] = None, since: Optional[datetime] = None,
+             last: Optional[int] = None) -> List[Dict]:
+        """Index entries, oldest first, optionally filtered by kind and start time
+
+        The index is read from its end and runs are appended in time order,
+        so `last` and `since` stop the read once they are satisfied.
+        """
+        if not os.path.exists(self.index_path):
+            return []
+        entries = []
+        for line in _reversed_lines(self.index_path):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if since and datetime.fromisoformat(entry['timestamp']) < since:
+                break
+            if kind and entry['kind'] != kind:
+                continue
+            entries.append(entry)
+            if last and len(entries) == last:
+                break
+        return entries[::-1]
+
+    def latest(self, kind: str) -> Optional[Dict]:
+        """Summary of the newest run of `kind`: its index entry plus 'results', holding
+        every non-table section and the first LATEST_ROWS rows of each table"""
+        path = os.path.join(self.root, kind, 'latest.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def load(self, run: Dict) -> Dict:
+        """Rebuild a run's full results dict from its index entry"""
+        with np.load(os.path.join(self.root, run['path']), allow_pickle=False) as data:
+            results = json.loads(str(data[_SUMMARY_KEY]))
+            for name in run['tables']:
+                results[name] = self._frame(data, name).to_dict('records')
+        return results
+
+    def table(self, run: Dict, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """One table of a run, reading only the requested columns"""
+        if name not in run['tables']:
+            return pd.DataFrame()
+        with np.load(os.path.join(self.root, run['path']), allow_pickle=False) as data:
+            return self._frame(data, name, columns)
+
+    def series(self, kind: str, table: str, column: str, last: Optional[int] = None,
+               since: Optional[datetime] = None, **match) -> pd.DataFrame:
+        """`column` of the rows matching `match` (e.g. ticker='MSFT') across runs
+
+        Returns one row per matching table row, indexed by run timestamp.
+        """
+        frames = []
+        for run in self.runs(kind, since, last):
+            df = self.table(run, table, [column, *match])
+            if df.empty or column not in df:
+                continue
+            for key, value in match.items():
+                df = df[df[key] == value] if key in df else df.iloc[0:0]
+            if not df.empty:
+                frames.append(df.assign(run_id=run['run_id'],
+                                        timestamp=pd.Timestamp(run['timestamp'])))
+        if not frames:
+            return pd.DataFrame(columns=['timestamp', 'run_id', column])
+        return pd.concat(frames).set_index('timestamp')[['run_id', column]]
+
+    @staticmethod
+    def _frame(data, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        prefix = f'{name}/'
+        stored = [key[len(prefix):] for key in data.files if key.startswith(prefix)]
+        wanted = [c for c in columns if c in stored] if columns else stored
+        return pd.DataFrame({column: data[prefix + column] for column in wanted})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print stored analyzer runs as JSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+    show_parser = commands.add_parser('show', help="full results of the newest run of a kind")
+    show_parser.add_argument('kind')
+    show_parser.add_argument('--root', default=HISTORY_DIR)
+    args = parser.parse_args()
+
+    history = RunHistory(args.root)
+    latest = history.latest(args.kind)
+    if latest is None:
+        print(f"No {args.kind} runs in {args.root}", file=sys.stderr)
+        sys.exit(1)
+    results = _without_nan({'run_id': latest['run_id'], **history.load(latest)})
+    print(json.dumps(results, default=_json_default, allow_nan=False))
+
+
+if __name__ == "__main__":
+    main()
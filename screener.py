@@ -0,0 +1,142 @@
+import sys
+import json
+import heapq
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from bar_store import BarStore, get_default_store
+from instrumentation import count, span, traced
+from investment_analyzer import StockAnalyzer
+from market_data import period_start
+from realistic_strategy_analyzer import RealisticStrategyAnalyzer
+
+# Runs the 10% (moderate-risk) and momentum screens over every ticker in the
+# bar store, a chunk at a time. Only the running top-K rows of each screen
+# are kept between chunks, so memory does not grow with the universe.
+#
+#   python screener.py [--universe tickers.txt] [--chunk-size 250] [--top-k 25] [--refresh]
+
+# Screen name -> column it is ranked by
+SCREENS = {'moderate_risk': 'probability_10pct', 'momentum': 'momentum_score'}
+DEFAULT_CHUNK_SIZE = 250
+DEFAULT_TOP_K = 25
+
+
+class TopK:
+    """The `k` highest-scoring rows seen so far; ties keep the earliest row"""
+
+    def __init__(self, key: str, k: int):
+        self.key = key
+        self.k = k
+        self._heap = []  # min-heap of (score, -arrival, record)
+        self._arrivals = 0
+
+    def push(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        # Only a chunk's own top k can reach the overall top k
+        for record in df.nlargest(self.k, self.key).to_dict('records'):
+            self._arrivals += 1
+            item = (record[self.key], -self._arrivals, record)
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, item)
+
+    def frame(self) -> pd.DataFrame:
+        """Rows best first"""
+        return pd.DataFrame([record for *_, record in sorted(self._heap, reverse=True)])
+
+
+def last_period(bars: Dict[str, pd.DataFrame], period: str) -> Dict[str, pd.DataFrame]:
+    """Trim each ticker's bars to `period`, as BarStore.get_many(tickers, period) would"""
+    return {ticker: data[data.index >= period_start(period, data.index[-1])]
+            for ticker, data in bars.items() if not data.empty}
+
+
+class Screener:
+    """Chunked large-universe run of the analyzers' screens
+
+    Without a store, cached bars are screened as they are; refresh=True tops
+    stale tickers up from the provider first (the shared store's 15 minute
+    policy), which for thousands of tickers means many bulk downloads.
+    """
+
+    def __init__(self, store: BarStore = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 top_k: int = DEFAULT_TOP_K, refresh: bool = False):
+        if store is None:
+            store = get_default_store() if refresh else BarStore(refresh_after=float('inf'))
+        self.store = store
+        self.chunk_size = chunk_size
+        self.top_k = top_k
+        self.moderate = RealisticStrategyAnalyzer(bar_store=self.store)
+        self.momentum = StockAnalyzer(bar_store=self.store)
+
+    @traced()
+    def run(self, tickers: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Return {screen: top-K DataFrame}; defaults to every ticker in the store"""
+        tickers = tickers if tickers is not None else self.store.tickers()
+        leaders = {name: TopK(key, self.top_k) for name, key in SCREENS.items()}
+
+        for start in range(0, len(tickers), self.chunk_size):
+            chunk = tickers[start:start + self.chunk_size]
+            with span('screen_chunk', tickers=len(chunk)):
+                # One read of 3mo serves both screens; momentum uses its last month
+                bars = self.store.get_many(chunk, '3mo')
+                leaders['moderate_risk'].push(self.moderate.screen_moderate_risk(bars))
+                leaders['momentum'].push(self.momentum.score_momentum(last_period(bars, '1mo')))
+            count('tickers_screened', len(chunk))
+
+        return {name: heap.frame() for name, heap in leaders.items()}
+
+
+def read_universe(path: str) -> List[str]:
+    """One ticker per line; blank lines and # comments are skipped"""
+    with open(path) as f:
+        lines = (line.split('#')[0].strip().upper() for line in f)
+        return [line for line in lines if line]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a large ticker universe from the bar store")
+    parser.add_argument('--universe', help="file with one ticker per line (default: every cached ticker)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--output', default='screen_results.json')
+    parser.add_argument('--refresh', action='store_true',
+                        help="top up stale cached bars from the provider before screening")
+    args = parser.parse_args()
+
+    screener = Screener(chunk_size=args.chunk_size, top_k=args.top_k, refresh=args.refresh)
+    tickers = read_universe(args.universe) if args.universe else screener.store.tickers()
+    if not tickers:
+        print("No tickers to screen")
+        sys.exit(1)
+
+    print(f"Screening {len(tickers)} tickers in chunks of {args.chunk_size}...")
+    results = screener.run(tickers)
+
+    columns = {
+        'moderate_risk': ['ticker', 'current_price', 'monthly_return', 'volatility',
+                          'risk_score', 'probability_10pct'],
+        'momentum': ['ticker', 'current_price', 'weekly_return', 'monthly_return', 'momentum_score']
+    }
+    for name, df in results.items():
+        print(f"\nTop {len(df)} by {SCREENS[name]}:")
+        print(df[columns[name]].head(10) if not df.empty else "  (none)")
+
+    output = {
+        'timestamp': datetime.now().isoformat(),
+        'universe_size': len(tickers),
+        'top_k': args.top_k,
+        **{name: df.to_dict('records') for name, df in results.items()}
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2, default=lambda v: v.item() if isinstance(v, np.generic) else str(v))
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import path from 'path'
 const execAsync = promisify(exec)
 const app = express()
 const PORT = process.env.PORT || 3003
+const ANALYSIS_WORKER_URL = process.env.ANALYSIS_WORKER_URL || 'http://127.0.0.1:8765'
+const RUN_HISTORY_DIR = process.env.RUN_HISTORY_DIR || 'run_history'
 
 // Middleware
 app.use(cors())
@@ -171,19 +173,43 @@ app.post('/api/position-sizing', (req, res) => {
   }
 })
 
+// Ask the warm Python analysis worker (python analysis_worker.py) for
+// { status, body }; null only if the worker cannot be reached
+const runWorkerAnalysis = async (params) => {
+  let response
+  try {
+    response = await fetch(`${ANALYSIS_WORKER_URL}/analysis`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(params)
+    })
+  } catch (error) {
+    return null
+  }
+  const body = await response.json().catch(() => ({ error: 'Invalid response from analysis worker' }))
+  return { status: response.status, body }
+}
+
 // Monte Carlo simulation endpoint
 app.post('/api/monte-carlo', async (req, res) => {
   try {
-    // Run Python Monte Carlo simulation
+    const { tickers, volatility, days, simulations } = req.body || {}
+    // Worker answers (including 400/404/500 errors) go straight to the client
+    const worker = await runWorkerAnalysis({ tickers, volatility, days, simulations })
+    if (worker) {
+      return res.status(worker.status).json(worker.body)
+    }
+    
+    // No worker - run Python Monte Carlo simulation in a fresh process
     const { stdout } = await execAsync('python realistic_strategy_analyzer.py', {
       cwd: process.cwd()
     })
     
-    // Read results from JSON file
-    const resultsPath = path.join(process.cwd(), 'realistic_strategy_results.json')
-    if (fs.existsSync(resultsPath)) {
-      const results = JSON.parse(fs.readFileSync(resultsPath, 'utf8'))
-      res.json(results)
+    // Serve the dashboard summary the run wrote to the run history
+    const latestPath = path.join(process.cwd(), RUN_HISTORY_DIR, 'realistic_strategy', 'latest.json')
+    if (fs.existsSync(latestPath)) {
+      const latest = JSON.parse(fs.readFileSync(latestPath, 'utf8'))
+      res.json({ run_id: latest.run_id, ...latest.results })
     } else {
       // Return default results if file doesn't exist
       res.json(getStrategyData().monteCarlo)
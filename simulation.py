@@ -0,0 +1,217 @@
+import numpy as np
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from instrumentation import count
+from normal_dist import norm_cdf, norm_ppf
+from streaming_stats import DEFAULT_EXACT_LIMIT, StreamingStats
+
+TRADING_DAYS = 252
+PERCENTILES = [5, 25, 50, 75, 95]
+DEFAULT_CHUNK_SIZE = 100000  # paths per block; bounds peak memory of the generators
+MAX_CHUNK_ELEMENTS = 4000000  # cap on random draws per block for multi-asset runs
+
+
+def lognormal_terminal_stats(current_price: float, volatility: float, days: int = 30,
+                             drift: float = 0.0, thresholds: Iterable[float] = (),
+                             percentiles: Iterable[float] = PERCENTILES) -> Dict:
+    """Exact terminal-price statistics for the GBM used by the simulators
+
+    With daily steps of (drift - vol^2/2) dt + vol sqrt(dt) Z, ln(S_T/S_0) is
+    normal with mean (drift - vol^2/2) T and variance vol^2 T, so the mean,
+    percentiles and P(S_T >= threshold) all have closed forms.
+    """
+    t = days / TRADING_DAYS
+    log_mean = (drift - 0.5 * volatility ** 2) * t
+    log_std = volatility * np.sqrt(t)
+
+    percentiles = list(percentiles)
+    z = norm_ppf(np.asarray(percentiles, dtype=np.float64) / 100)
+    values = current_price * np.exp(log_mean + log_std * z)
+
+    probabilities = {}
+    for threshold in thresholds:
+        if log_std > 0:
+            d = (np.log(current_price / threshold) + log_mean) / log_std
+            probabilities[threshold] = float(norm_cdf(d)) * 100
+        else:
+            probabilities[threshold] = 100.0 if current_price * np.exp(log_mean) >= threshold else 0.0
+
+    return {
+        'mean': current_price * np.exp(drift * t),
+        'percentiles': dict(zip(percentiles, values.tolist())),
+        'prob_at_least': probabilities
+    }
+
+
+def compare_results(analytic: Dict, simulated: Dict) -> Dict:
+    """Report the discrepancy between analytic and Monte Carlo result dicts"""
+    discrepancy = {}
+    for key, exact in analytic.items():
+        estimate = simulated.get(key)
+        if not isinstance(exact, (int, float)) or not isinstance(estimate, (int, float)):
+            continue
+        diff = estimate - exact
+        discrepancy[key] = {
+            'analytic': exact,
+            'monte_carlo': estimate,
+            'abs_diff': round(diff, 4),
+            'rel_diff_pct': round(diff / exact * 100, 4) if exact else None
+        }
+    return discrepancy
+
+
+def _standard_normal(rng, size, dtype) -> np.ndarray:
+    if isinstance(rng, np.random.Generator):
+        return rng.standard_normal(size, dtype=dtype)
+    # RandomState (and the legacy np.random module) only draw float64
+    return rng.standard_normal(size).astype(dtype, copy=False)
+
+
+def generate_paths(current_price: float, volatility: float, days: int = 30,
+                   drift: float = 0.0, num_simulations: int = 10000,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64,
+                   rng=None, terminal_only: bool = False) -> Iterator[np.ndarray]:
+    """Yield GBM price paths in blocks of at most `chunk_size` rows
+
+    Each block has shape (rows, days + 1) and is built from a cumulative sum
+    of log-increments, so peak memory is one block regardless of how many
+    simulations are requested. With terminal_only=True each block is just the
+    final prices, shape (rows,), from the same draws summed instead.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    dt = 1 / TRADING_DAYS
+    step_mean = (drift - 0.5 * volatility ** 2) * dt
+    step_std = volatility * np.sqrt(dt)
+
+    for start in range(0, num_simulations, chunk_size):
+        rows = min(chunk_size, num_simulations - start)
+        shocks = _standard_normal(rng, (rows, days), dtype)
+        if terminal_only:
+            log_return = shocks.sum(axis=1)
+            log_return *= step_std
+            log_return += step_mean * days
+            yield current_price * np.exp(log_return)
+            continue
+
+        shocks *= step_std
+        shocks += step_mean
+        paths = np.empty((rows, days + 1), dtype=dtype)
+        paths[:, 0] = 0
+        np.cumsum(shocks, axis=1, out=paths[:, 1:])
+        np.exp(paths, out=paths)
+        paths *= current_price
+        yield paths
+
+
+def terminal_price_stats(current_price: float, volatility: float, days: int = 30,
+                         drift: float = 0.0, thresholds: Iterable[float] = (),
+                         percentiles: Iterable[float] = PERCENTILES,
+                         num_simulations: int = 10000,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, dtype=np.float64,
+                         seed=None, workers: int = 1) -> Dict:
+    """Simulated counterpart of lognormal_terminal_stats, returning the same dict"""
+    sample = partial(sample_terminal_prices, current_price, volatility, days, drift, dtype)
+    stats = run_blocks(sample, num_simulations, seed, thresholds, chunk_size, workers)
+    return stats_summary(stats, percentiles)
+
+
+def split_blocks(num_simulations: int, block_size: int, seed=None) -> List[Tuple[int, np.random.SeedSequence]]:
+    """Split a run into fixed-size blocks, each with its own spawned seed
+
+    Blocks depend only on the simulation count, block size and root seed, so
+    results are the same however many workers process them.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    sizes = [min(block_size, num_simulations - start)
+             for start in range(0, num_simulations, block_size)]
+    return list(zip(sizes, seed.spawn(len(sizes))))
+
+
+def _run_block(task) -> StreamingStats:
+    sample, rows, seed, thresholds, exact_limit = task
+    stats = StreamingStats(thresholds, exact_limit=exact_limit)
+    stats.update(sample(rows, np.random.default_rng(seed)))
+    return stats
+
+
+def run_blocks(sample: Callable, num_simulations: int, seed=None,
+               thresholds: Iterable[float] = (), block_size: int = DEFAULT_CHUNK_SIZE,
+               workers: int = 1) -> StreamingStats:
+    """Run `sample(rows, rng)` over independent seeded blocks and merge the results
+
+    With workers > 1 the blocks are spread over a process pool; `sample`
+    must then be picklable (a module-level function or functools.partial).
+    Partial results are merged in block order, so the output is reproducible
+    from the root seed regardless of the worker count.
+    """
+    thresholds = list(thresholds)
+    count('paths_simulated', num_simulations)
+    # Workers only ship raw values back when the whole run fits the exact path
+    exact_limit = DEFAULT_EXACT_LIMIT if num_simulations <= DEFAULT_EXACT_LIMIT else 0
+    tasks = [(sample, rows, child, thresholds, exact_limit)
+             for rows, child in split_blocks(num_simulations, block_size, seed)]
+
+    stats = StreamingStats(thresholds, exact_limit=exact_limit)
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial_stats in pool.map(_run_block, tasks):
+                stats.merge(partial_stats)
+    else:
+        for task in tasks:
+            stats.merge(_run_block(task))
+    return stats
+
+
+def sample_terminal_prices(current_price: float, volatility: float, days: int,
+                           drift: float, dtype, rows: int, rng) -> np.ndarray:
+    """Final prices of `rows` simulated paths (a run_blocks sampler)"""
+    return next(generate_paths(current_price, volatility, days, drift, rows, rows,
+                               dtype, rng, terminal_only=True))
+
+
+def sample_portfolio_values(expected_returns, volatilities, weights, offset: float,
+                            correlation_factor, rows: int, rng) -> np.ndarray:
+    """offset + weighted returns for `rows` simulations (a run_blocks sampler)"""
+    return offset + np.concatenate(list(generate_portfolio_returns(
+        expected_returns, volatilities, weights, rows, rng=rng,
+        correlation_factor=correlation_factor
+    )))
+
+
+def stats_summary(stats: StreamingStats, percentiles: Iterable[float] = PERCENTILES) -> Dict:
+    """Mean, percentiles and exceedance probabilities in the lognormal_terminal_stats layout"""
+    percentiles = list(percentiles)
+    return {
+        'mean': stats.mean(),
+        'percentiles': dict(zip(percentiles, stats.percentiles(percentiles))),
+        'prob_at_least': stats.probabilities()
+    }
+
+
+def generate_portfolio_returns(expected_returns, volatilities, weights,
+                               num_simulations: int = 10000,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE, rng=None,
+                               correlation_factor: np.ndarray = None) -> Iterator[np.ndarray]:
+    """Yield blocks of weighted portfolio returns, one normal draw per position
+
+    Each block is a (rows, positions) matrix of N(expected_return, volatility)
+    draws reduced with the weight vector, replacing a Python loop per
+    simulation and position. Passing the factor of a correlation matrix
+    correlates the draws across positions; otherwise they are independent.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    expected_returns = np.asarray(expected_returns, dtype=np.float64)
+    volatilities = np.asarray(volatilities, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_ELEMENTS // max(len(weights), 1)))
+
+    for start in range(0, num_simulations, chunk_size):
+        rows = min(chunk_size, num_simulations - start)
+        shocks = rng.standard_normal((rows, len(weights)))
+        if correlation_factor is not None:
+            shocks = shocks @ correlation_factor.T
+        returns = expected_returns + volatilities * shocks
+        yield (returns * weights).sum(axis=1)
+
@@ -0,0 +1,66 @@
+import os
+import sys
+import subprocess
+import warnings
+import pytest
+
+# Import-time budgets in milliseconds on top of a bare `import numpy`, so the
+# check tracks our own import cost rather than the machine's speed. Going over
+# budget warns; going over FAIL_MARGIN x budget (a real regression rather than
+# timing noise) fails, as does loading a heavy module at import.
+BUDGETS_MS = {
+    'pricing': 25,
+    'simulation': 60,
+    'investment_analyzer': 80,
+    'realistic_strategy_analyzer': 80,
+    'analysis_worker': 100,
+}
+
+# Modules the NumPy-only core must not load at import time
+HEAVY_MODULES = ['pandas', 'yfinance', 'bar_store', 'market_data', 'covariance', 'multiprocessing']
+REPEATS = 5
+FAIL_MARGIN = 2.0
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+# Lazily imported modules sit in sys.modules unexecuted; count only real loads
+loaded = [name for name in {heavy!r}
+          if any(m == name or m.startswith(name + '.') for m in sys.modules
+                 if type(sys.modules[m]).__name__ != '_LazyModule')]
+print(repr((elapsed, loaded)))
+"""
+
+
+def measure(module: str, repeats: int = REPEATS):
+    """Best-of-`repeats` import time (ms) of `module` in fresh interpreters, and the heavy modules it loaded"""
+    times, loaded = [], []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout
+        elapsed, loaded = eval(output.strip().splitlines()[-1])
+        times.append(elapsed)
+    return min(times) * 1000, loaded
+
+
+@pytest.fixture(scope='module')
+def numpy_ms():
+    return measure('numpy')[0]
+
+
+@pytest.mark.parametrize('module', list(BUDGETS_MS))
+def test_import_stays_light(module, numpy_ms, record_property):
+    ms, loaded = measure(module)
+    overhead = ms - numpy_ms
+    record_property('import_overhead_ms', round(overhead, 1))
+    assert not loaded, f"importing {module} loaded {', '.join(loaded)}"
+    budget = BUDGETS_MS[module]
+    assert overhead <= FAIL_MARGIN * budget, \
+        f"{module}: {overhead:.0f}ms over numpy, more than {FAIL_MARGIN:g}x its {budget}ms budget"
+    if overhead > budget:
+        warnings.warn(f"{module}: {overhead:.0f}ms over numpy (budget {budget}ms)")
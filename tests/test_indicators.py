@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from indicators import MONTH_BARS, IndicatorState, momentum_indicators, rolling_mean
+
+BARS = 1500  # more than twice RollingWindow's default resync_every
+
+
+def _history(seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, BARS)))
+    volume = rng.lognormal(14, 0.5, BARS)
+    # A run of flat closes gives zero gains/losses windows for the RSI
+    close[400:420] = close[399]
+    return close, volume
+
+
+def _assert_matches_batch(state, close, volume, month_bars=None):
+    # The batch path over the trailing window the state measures monthly_return on
+    if month_bars:
+        close, volume = close[-month_bars:], volume[-month_bars:]
+    batch = momentum_indicators(close[:, None], volume[:, None])
+    incremental = state.indicators()
+    assert incremental.keys() == batch.keys()
+    for key, expected in batch.items():
+        if key.startswith('above_'):
+            # A close equal to its SMA (a flat run) is a tie decided by rounding
+            window = 5 if key == 'above_sma5' else 20
+            sma = rolling_mean(close[-window:, None], window)[-1, 0]
+            if not np.isclose(close[-1], sma, rtol=1e-12, atol=0):
+                assert incremental[key] == bool(expected[0]), key
+        else:
+            np.testing.assert_allclose(incremental[key], expected[0], rtol=1e-9, atol=1e-9,
+                                       equal_nan=True, err_msg=key)
+
+
+def test_state_matches_batch_after_every_bar_and_revision():
+    close, volume = _history()
+    rng = np.random.default_rng(11)
+    state = IndicatorState()
+    seen_close, seen_volume = [], []
+
+    for i in range(BARS):
+        # Open the bar on a provisional tick, then revise it to the final close
+        ticks = [close[i] * (1 + rng.normal(0, 0.01)) for _ in range(i % 3)] + [close[i]]
+        for j, tick in enumerate(ticks):
+            state.update(tick, volume[i] * (j + 1) / len(ticks), new_bar=j == 0)
+            revised_close = np.array(seen_close + [tick])
+            revised_volume = np.array(seen_volume + [volume[i] * (j + 1) / len(ticks)])
+            # momentum_indicators needs the 5 bars of the weekly lookback
+            if len(revised_close) >= 5:
+                _assert_matches_batch(state, revised_close, revised_volume, MONTH_BARS)
+        seen_close.append(close[i])
+        seen_volume.append(volume[i])
+
+    assert state.bars == BARS
+    assert state.closes._updates > 2 * state.closes.resync_every
+
+
+def test_from_history_matches_batch():
+    close, volume = _history(seed=5)
+    _assert_matches_batch(IndicatorState.from_history(close, volume), close, volume)
+
+
+def test_streaming_past_seed_window_keeps_monthly_window():
+    close, volume = _history(seed=8)
+    seed = 22
+    state = IndicatorState.from_history(close[:seed], volume[:seed])
+    for i in range(seed, seed + 3 * seed):
+        state.update(close[i], volume[i])
+        _assert_matches_batch(state, close[:i + 1], volume[:i + 1], seed)
+    since_seed = (close[i] / close[0] - 1) * 100
+    assert state.indicators()['monthly_return'] != pytest.approx(since_seed)
+
+
+def test_revising_first_bar_moves_monthly_base():
+    state = IndicatorState()
+    state.update(100.0, 1.0)
+    state.update(50.0, 1.0, new_bar=False)
+    state.update(55.0, 1.0)
+    assert state.indicators()['monthly_return'] == pytest.approx(10.0)
+
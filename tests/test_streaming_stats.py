@@ -0,0 +1,76 @@
+import itertools
+import numpy as np
+import pytest
+from streaming_stats import StreamingStats
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def _samples():
+    rng = np.random.default_rng(7)
+    return {
+        'lognormal prices': 100 * np.exp(rng.normal(-0.01, 0.1, 200000)),
+        'normal returns': rng.normal(0.10, 0.15, 200000),
+    }
+
+
+def _sketch(chunks, exact_limit=0):
+    stats = StreamingStats(thresholds=[0.0, 0.1, 100.0, 110.0], exact_limit=exact_limit)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+@pytest.mark.parametrize('name', list(_samples()))
+def test_sketch_percentiles_within_relative_accuracy(name):
+    values = _samples()[name]
+    stats = _sketch(np.array_split(values, 10))
+    assert not stats.is_exact
+
+    # The bound is against the sample at the same rank, i.e. method='lower'
+    exact = np.percentile(values, PERCENTILES, method='lower')
+    estimate = np.array(stats.percentiles(PERCENTILES))
+    relative = np.abs(estimate - exact) / np.abs(exact)
+    assert np.all(relative <= stats.sketch.relative_accuracy)
+
+
+def test_exact_mode_matches_np_percentile():
+    values = _samples()['normal returns'][:5000]
+    stats = _sketch(np.array_split(values, 5), exact_limit=len(values))
+    assert stats.is_exact
+    np.testing.assert_allclose(stats.percentiles(PERCENTILES), np.percentile(values, PERCENTILES))
+
+
+@pytest.mark.parametrize('exact_limit', [0, 10 ** 6])
+def test_merge_order_matches_single_pass(exact_limit):
+    values = _samples()['lognormal prices']
+    single = _sketch([values], exact_limit)
+    parts = np.array_split(values, 4)
+
+    for order in itertools.permutations(range(len(parts))):
+        merged = _sketch([], exact_limit)
+        for i in order:
+            merged.merge(_sketch(np.array_split(parts[i], 3), exact_limit))
+        assert merged.count == single.count
+        assert merged.is_exact == single.is_exact
+        if exact_limit:
+            np.testing.assert_allclose(merged.percentiles(PERCENTILES), single.percentiles(PERCENTILES))
+        else:
+            # Bucket counts add, so merged sketches are bit-identical to one pass
+            assert merged.percentiles(PERCENTILES) == single.percentiles(PERCENTILES)
+        assert merged.probabilities() == single.probabilities()
+        assert merged.mean() == pytest.approx(values.mean(), rel=1e-12)
+
+
+@pytest.mark.parametrize('name', list(_samples()))
+def test_exceedance_probabilities_match_exact_counts(name):
+    values = _samples()[name]
+    stats = _sketch(np.array_split(values, 7))
+    for threshold, probability in stats.probabilities().items():
+        assert probability == np.count_nonzero(values >= threshold) / len(values) * 100
+
+
+def test_empty_stats_report_nan():
+    stats = StreamingStats(thresholds=[1.0])
+    assert all(np.isnan(stats.percentiles(PERCENTILES)))
+    assert np.isnan(stats.probabilities()[1.0])
@@ -1,58 +1,44 @@
-import time
-import os
-from datetime import datetime
+from plan_watcher import PLAN_PATH, PlanWatcher, timestamp
 
-def check_project_plan():
-    """Check project_plan.txt for updates and changes"""
-    project_plan_path = r"C:\Users\ebalo\claude_stuff\project_plan.txt"
+def has_ui_tasks(text: str) -> bool:
+    """Check for TODO items assigned to UI agent"""
+    return "UI Agent:" in text or "ui-agent:" in text.lower()
+
+def report_change(change):
+    if change['status'] == 'deleted':
+        print(f"[{timestamp()}] project_plan.txt not found")
+        return
     
-    if not os.path.exists(project_plan_path):
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] project_plan.txt not found")
-        return None
+    print(f"\n[{timestamp()}] Project plan updated!")
+    print("-" * 50)
+    print("New changes detected in project_plan.txt")
+    print(change['diff'], end='')
     
-    try:
-        with open(project_plan_path, 'r') as f:
-            content = f.read()
-        return content
-    except Exception as e:
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Error reading project_plan.txt: {e}")
-        return None
+    # Only the added lines can carry new work for the UI agent
+    added = ''.join(line[1:] for line in change['diff'].splitlines(keepends=True)
+                    if line.startswith('+') and not line.startswith('+++'))
+    if has_ui_tasks(added):
+        print("✓ Found tasks for UI Agent - review project_plan.txt for details")
 
 def monitor_project_plan():
-    """Monitor project_plan.txt every 60 seconds"""
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] UI Agent Monitor started")
-    print("Monitoring project_plan.txt every 60 seconds...")
+    """Monitor project_plan.txt, reacting as soon as it changes"""
+    watcher = PlanWatcher(PLAN_PATH)
+    print(f"[{timestamp()}] UI Agent Monitor started")
+    print(f"Monitoring project_plan.txt for changes ({watcher.backend})...")
     print("Press Ctrl+C to stop monitoring\n")
     
-    last_content = None
+    content = watcher.snapshot()
+    if content is None:
+        print(f"[{timestamp()}] project_plan.txt not found")
+    else:
+        print(f"[{timestamp()}] Initial project plan loaded")
+        if has_ui_tasks(content):
+            print("✓ Found tasks for UI Agent - review project_plan.txt for details")
     
-    while True:
-        try:
-            current_content = check_project_plan()
-            
-            if current_content and current_content != last_content:
-                print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Project plan updated!")
-                print("-" * 50)
-                
-                if last_content:
-                    print("New changes detected in project_plan.txt")
-                else:
-                    print("Initial project plan loaded")
-                
-                last_content = current_content
-                
-                # Check for TODO items assigned to UI agent
-                if "UI Agent:" in current_content or "ui-agent:" in current_content.lower():
-                    print("✓ Found tasks for UI Agent - review project_plan.txt for details")
-            
-            time.sleep(60)  # Wait 60 seconds before next check
-            
-        except KeyboardInterrupt:
-            print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Monitoring stopped by user")
-            break
-        except Exception as e:
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {e}")
-            time.sleep(60)
+    try:
+        watcher.watch(report_change)
+    except KeyboardInterrupt:
+        print(f"\n[{timestamp()}] Monitoring stopped by user")
 
 if __name__ == "__main__":
-    monitor_project_plan()
\ No newline at end of file
+    monitor_project_plan()
@@ -1,5 +1,6 @@
 import json
 from datetime import datetime, timedelta
+from option_chain_store import refresh_premiums
 
 def generate_wsb_analysis():
     """
@@ -82,6 +83,12 @@ def generate_wsb_analysis():
         }
     ]
     
+    # Use stored chain quotes instead of the literal premiums where a snapshot exists
+    refresh_premiums(strategies)
+    for strategy in strategies:
+        if 'premium_as_of' in strategy:
+            strategy['contracts_affordable'] = int(initial_capital / (strategy['option_premium'] * 100))
+    
     risk_disclaimer = """
     CRITICAL RISK WARNING:
     - 43% return in 30 days is EXTREMELY RARE and HIGH RISK
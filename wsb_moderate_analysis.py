@@ -1,5 +1,6 @@
 import json
 from datetime import datetime, timedelta
+from option_chain_store import refresh_premiums
 
 def generate_moderate_wsb_analysis():
     """
@@ -95,6 +96,13 @@ def generate_moderate_wsb_analysis():
         }
     ]
     
+    # Use stored chain quotes instead of the literal premiums where a snapshot exists
+    refresh_premiums(strategies)
+    for strategy in strategies:
+        if 'premium_as_of' in strategy:
+            budget = initial_capital * float(strategy['allocation'].split('%')[0]) / 100
+            strategy['contracts'] = int(budget / (strategy['option_premium'] * 100))
+    
     # Position sizing for 10% total return
     position_analysis = {
         "target_per_position": "8-15% return per winning trade",